@@ -0,0 +1,689 @@
+import os
+import time
+from datetime import datetime
+import threading
+import logging
+import warnings
+import numpy as np
+import indicators
+import signal_rules
+import db
+from stats import stats_cache
+from metrics import STAGE_SECONDS, SYMBOL_SECONDS, FETCH_FAILURES, EMPTY_FRAMES, SIGNALS_GENERATED, SIGNAL_TRANSITIONS
+from startup import startup_report
+from snapshot import snapshot_store
+from scheduler import AdaptiveScheduler, now_ist
+from telegram_client import TelegramClient, OutboundQueue
+from market_data import get_provider, chunked, FETCH_CHUNK_SIZE
+from concurrency import TokenBucket, SingleFlight, run_concurrently
+from concurrent.futures import ThreadPoolExecutor
+from bar_cache import BarCache
+from history_store import HistoryStore
+from indicator_state import IndicatorStateStore, advance, bar_labels
+from signal_state import SignalStateStore
+from parallel import IndicatorPool, INDICATOR_PROCESSES
+from universe import load_universe, shard_symbols, UniverseRotation, SHARD_INDEX, SHARD_COUNT
+
+# Suppress warnings
+warnings.filterwarnings('ignore')
+
+logger = logging.getLogger(__name__)
+
+class SimpleNiftyAnalyzer:
+    def __init__(self):
+        # Symbols come from universes/<UNIVERSE>.txt; each shard scans its own slice
+        self.nifty_symbols = shard_symbols(load_universe())
+        self.universe = UniverseRotation(self.nifty_symbols)
+        logger.info(f"Scanning {len(self.nifty_symbols)} symbols (shard {SHARD_INDEX + 1}/{SHARD_COUNT})")
+        
+        # A cycle stops starting new chunks once it would overrun this budget;
+        # the symbols it skipped are scanned first next cycle
+        self.cycle_budget = float(os.getenv('CYCLE_BUDGET_SECONDS', '240'))
+        self.scan_chunk_size = FETCH_CHUNK_SIZE
+        
+        self.telegram_token = os.getenv('TELEGRAM_BOT_TOKEN')
+        self.telegram_chat_id = os.getenv('TELEGRAM_CHAT_ID')
+        
+        # Per-symbol work runs in a bounded pool; provider calls share one rate limit
+        self.max_workers = int(os.getenv('ANALYSIS_WORKERS', '4'))
+        self.rate_limiter = TokenBucket(
+            rate=float(os.getenv('FETCH_RATE_PER_SECOND', '2')),
+            capacity=float(os.getenv('FETCH_RATE_BURST', '4'))
+        )
+        
+        # Market data source (MARKET_DATA_PROVIDER): yfinance, replay or synthetic
+        self.provider = get_provider()
+        
+        # Initialize database
+        self.init_database()
+        
+        # Cached daily bars; each cycle only downloads the missing tail
+        self.bar_cache = BarCache()
+        self.history_bars = int(os.getenv('HISTORY_BARS', '30'))
+        
+        # Relative close change on an already cached, completed bar that marks a split or dividend re-adjustment
+        self.adjustment_tolerance = float(os.getenv('BAR_ADJUSTMENT_TOLERANCE', '0.002'))
+        
+        # Optionally mirror fetched bars into the columnar store used by backtests
+        self.history_store = HistoryStore() if os.getenv('HISTORY_STORE_SYNC', '0') == '1' else None
+        
+        # Currently active signals, so repeats of a holding condition are not re-alerted
+        self.signal_state = SignalStateStore()
+        
+        # Optional process pool for indicator math on large universes
+        self.indicator_pool = IndicatorPool() if INDICATOR_PROCESSES > 0 else None
+        
+        # Rolling indicator state per symbol, so each cycle only applies new bars
+        self.state_store = IndicatorStateStore()
+        self.indicator_states = self.state_store.load_all()
+        self.state_lock = threading.Lock()
+        
+        # Raw signals older than this are folded into daily counts once a day
+        self.retention_days = int(os.getenv('SIGNAL_RETENTION_DAYS', '30'))
+        self.last_rollup_day = None
+        
+        # Overlapping analysis requests share one cycle; recent results are reused
+        self.analysis_flight = SingleFlight('Analysis cycle')
+        self.analysis_freshness = float(os.getenv('ANALYZE_FRESHNESS_SECONDS', '120'))
+        
+        # Keep-alive Bot API client; command handlers run off the polling thread
+        self.telegram = TelegramClient(self.telegram_token) if self.telegram_token else None
+        self.outbound = OutboundQueue(self.telegram) if self.telegram else None
+        self.command_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='telegram-command')
+        
+        # Start background bot if Telegram configured; only one shard may poll for commands
+        if self.telegram_token and self.telegram_chat_id and SHARD_INDEX == 0:
+            threading.Thread(target=self.setup_telegram_bot, daemon=True).start()
+        
+        logger.info("SimpleNiftyAnalyzer initialized successfully")
+        
+    def init_database(self):
+        """Initialize SQLite database"""
+        try:
+            with db.transaction() as cursor:
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS analysis_results (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        symbol TEXT,
+                        signal_type TEXT,
+                        strength TEXT,
+                        price REAL,
+                        timestamp DATETIME,
+                        description TEXT
+                    )
+                ''')
+            
+            db.migrate()
+            logger.info("Database initialized successfully")
+        except Exception as e:
+            logger.error(f"Database initialization error: {e}")
+    
+    def setup_telegram_bot(self):
+        """Setup Telegram bot with simple webhook check"""
+        try:
+            bot_info = self.telegram.get_me()
+            
+            if bot_info is not None:
+                logger.info(f"Telegram bot connected: {bot_info.get('username', 'Unknown')}")
+                
+                self.send_telegram_message("🚀 <b>Enhanced Nifty Bot Started!</b>\n\n✅ Ready for trading signals\n\n<i>Commands: /start, /signals</i>", coalesce=False)
+                
+                self.start_command_monitoring()
+            else:
+                logger.error("Failed to connect to Telegram bot")
+                
+        except Exception as e:
+            logger.error(f"Telegram setup error: {e}")
+    
+    def start_command_monitoring(self):
+        """Monitor for commands using long polling
+
+        getUpdates returns as soon as a message arrives, so there is no sleep
+        between polls; only errors back off, doubling up to a minute.
+        """
+        last_update_id = 0
+        backoff = 1
+        
+        while True:
+            try:
+                updates = self.telegram.get_updates(last_update_id + 1)
+                backoff = 1
+                
+                for update in updates:
+                    last_update_id = update['update_id']
+                    
+                    if 'message' in update:
+                        self.command_executor.submit(self.handle_telegram_message, update['message'])
+                
+            except Exception as e:
+                logger.error(f"Command monitoring error: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+    
+    def handle_telegram_message(self, message):
+        """Handle incoming Telegram messages"""
+        try:
+            text = message.get('text', '').strip()
+            chat_id = message.get('chat', {}).get('id')
+            
+            if not text or not chat_id:
+                return
+            
+            text_lower = text.lower()
+            
+            if text.startswith('/start') or text_lower == 'start':
+                response = """🚀 <b>Nifty 50 Trading Bot!</b>
+
+📊 <b>Features:</b>
+• Real-time technical analysis
+• RSI, SMA indicators
+• Automated signals
+
+<b>Commands:</b>
+• /signals - Latest analysis
+• /analyze - Run analysis
+
+<i>Try: "/signals"</i>"""
+                
+                self.send_message_to_chat(chat_id, response)
+                
+            elif text.startswith('/signals') or 'signals' in text_lower:
+                # Read the table rather than this process's state, which only
+                # tracks this shard's symbols between restarts
+                signals = self.get_latest_signals_from_db()
+                signals.sort(key=lambda signal: signal_rules.STRENGTH_RANK.get(signal['strength'], 0), reverse=True)
+                if signals:
+                    self.send_message_to_chat(chat_id, self.format_signals_message(signals))
+                else:
+                    self.send_message_to_chat(chat_id, "🔍 <b>Running analysis...</b>\n\nPlease wait.")
+                    self.run_immediate_analysis(chat_id)
+                
+            elif text.startswith('/analyze') or 'analyze' in text_lower:
+                self.send_message_to_chat(chat_id, "🔍 <b>Starting analysis...</b>")
+                self.run_immediate_analysis(chat_id)
+                
+            else:
+                unknown_msg = """🤖 <b>Try:</b>
+
+• /signals - Latest analysis  
+• /analyze - Run analysis
+
+<i>Example: "/signals"</i>"""
+                self.send_message_to_chat(chat_id, unknown_msg)
+                
+        except Exception as e:
+            logger.error(f"Error handling message: {e}")
+    
+    def run_analysis_cycle(self, max_age=None):
+        """Run analyze_nifty_50, joining a cycle that is already in progress"""
+        return self.analysis_flight.do(self.analyze_nifty_50, max_age=max_age)
+    
+    def run_immediate_analysis(self, chat_id):
+        """Run immediate analysis and send results
+
+        Joins a running cycle, or reuses one that finished within
+        ANALYZE_FRESHNESS_SECONDS, instead of starting another scan.
+        """
+        def reply(signals, error):
+            if error is not None:
+                logger.error(f"Error in immediate analysis: {error}")
+                self.send_message_to_chat(chat_id, "❌ <b>Analysis failed.</b> Please try again later.")
+                return
+            
+            if signals:
+                message = "✅ <b>Analysis Complete!</b>\n\n" + self.format_signals_message(signals)
+            else:
+                message = "✅ <b>Analysis Complete!</b>\n\n🔍 No strong signals detected."
+            
+            self.send_message_to_chat(chat_id, message)
+        
+        try:
+            self.analysis_flight.submit(self.analyze_nifty_50, reply, max_age=self.analysis_freshness)
+        except Exception as e:
+            logger.error(f"Error in immediate analysis: {e}")
+    
+    def send_message_to_chat(self, chat_id, message):
+        """Queue a reply to a specific chat"""
+        try:
+            self.outbound.send(chat_id, message)
+        except Exception as e:
+            logger.error(f"Error sending message to chat: {e}")
+    
+    def get_latest_signals_from_db(self):
+        """Get latest signals from database"""
+        try:
+            return db.latest_signals()
+        except Exception as e:
+            logger.error(f"Error getting signals from DB: {e}")
+            return []
+        
+    def publish_snapshot(self):
+        """Swap in a fresh pre-serialized snapshot of the latest signals"""
+        return snapshot_store.publish(self.get_latest_signals_from_db())
+    
+    def fetch_stock_data(self, symbol: str):
+        """Fetch one symbol's recent bars from the market data provider"""
+        try:
+            self.rate_limiter.acquire()
+            data = self.provider.history(symbol, period="30d", timeout=15)
+            
+            if data is None or data.empty:
+                logger.warning(f"No data found for {symbol}")
+                EMPTY_FRAMES.inc()
+                return None
+            
+            self.bar_cache.store(symbol, data)
+            return data
+        except Exception as e:
+            logger.error(f"Error fetching data for {symbol}: {e}")
+            FETCH_FAILURES.inc()
+            return None
+    
+    def fetch_stock_data_batch(self, symbols):
+        """Fetch stock data for many symbols, topping up the bar cache"""
+        recent = self.bar_cache.recent_closes(symbols)
+        
+        # Re-request from the oldest of the two newest cached bars: the newest
+        # may still be forming, and the completed one before it shows whether
+        # the provider has re-adjusted history since it was cached. Symbols
+        # sharing that date form one request.
+        anchors = {symbol: closes[-1] for symbol, closes in recent.items()}
+        groups = {}
+        for symbol in symbols:
+            groups.setdefault(anchors[symbol][0] if symbol in anchors else None, []).append(symbol)
+        
+        for start, group in groups.items():
+            if start is None:
+                # Cold symbols are warmed with enough history for the indicators
+                fetched = self.provider.download_batch(group, period="60d", rate_limiter=self.rate_limiter)
+            else:
+                fetched = self.provider.download_batch(group, start=start, rate_limiter=self.rate_limiter)
+                readjusted = [symbol for symbol, data in fetched.items()
+                              if self.history_readjusted(data, *anchors[symbol])]
+                if readjusted:
+                    self.refetch_history(readjusted, fetched)
+            
+            for symbol, data in fetched.items():
+                self.bar_cache.store(symbol, data)
+                if self.history_store is not None:
+                    self.history_store.write(symbol, data)
+            
+            stale = len(group) - len(fetched)
+            if start is not None and stale:
+                logger.warning(f"Using cached bars for {stale} symbols the provider did not return")
+        
+        frames = {}
+        for symbol in symbols:
+            data = self.bar_cache.load(symbol, limit=self.history_bars)
+            if data is not None:
+                frames[symbol] = data
+        
+        return frames
+    
+    def history_readjusted(self, data, day, cached_close):
+        """Whether a fetched bar's close differs from the cached one beyond the tolerance
+
+        Prices are split- and dividend-adjusted, so a corporate action
+        rescales every earlier bar while the cache still holds the old scale.
+        """
+        matches = [close for index, close in zip(data.index, data['Close']) if index.strftime('%Y-%m-%d') == day]
+        if not matches or not cached_close:
+            return False
+        return abs(float(matches[0]) / cached_close - 1) > self.adjustment_tolerance
+    
+    def refetch_history(self, symbols, fetched):
+        """Swap fresh history for re-adjusted symbols into fetched, dropping their stale cache and state"""
+        logger.info(f"Price history re-adjusted for {', '.join(symbols)}; refetching")
+        refetched = self.provider.download_batch(symbols, period="60d", rate_limiter=self.rate_limiter)
+        
+        for symbol in symbols:
+            if symbol in refetched:
+                self.bar_cache.clear(symbol)
+                with self.state_lock:
+                    self.indicator_states.pop(symbol, None)
+                fetched[symbol] = refetched[symbol]
+            else:
+                # Keep the consistently scaled cache rather than mixing in new-scale bars
+                logger.warning(f"Could not refetch history for {symbol}; using cached bars")
+                fetched.pop(symbol, None)
+        
+        if self.history_store is not None:
+            self.rewrite_history_store([symbol for symbol in symbols if symbol in refetched])
+    
+    def rewrite_history_store(self, symbols):
+        """Re-download the stored span of re-adjusted symbols so old bars match the new price scale"""
+        groups = {}
+        for symbol in symbols:
+            dates = self.history_store.column(symbol, 'date')
+            if dates is not None and len(dates):
+                groups.setdefault(str(np.datetime64(int(dates[0]), 'D')), []).append(symbol)
+        
+        for start, group in groups.items():
+            frames = self.provider.download_batch(group, start=start, rate_limiter=self.rate_limiter)
+            for symbol in group:
+                if symbol in frames:
+                    self.history_store.write(symbol, frames[symbol], replace=True)
+                else:
+                    # A short store beats one with a fake price gap
+                    self.history_store.clear(symbol)
+                    logger.warning(f"Cleared stored history of {symbol}; re-import it with history_store.py import")
+    
+    def calculate_rsi(self, prices, period=14):
+        """Calculate Wilder-smoothed RSI of the latest bar"""
+        try:
+            if len(prices) < period + 1:
+                return 50.0
+            
+            rsi = indicators.latest(indicators.rsi(np.asarray(prices, dtype=float), period), 50.0)[0]
+            return round(float(rsi), 2)
+        except Exception as e:
+            logger.error(f"RSI calculation error: {e}")
+            return 50.0
+    
+    def calculate_sma(self, prices, period=20):
+        """Calculate Simple Moving Average"""
+        try:
+            return float(indicators.sma_latest(np.asarray(prices, dtype=float), period)[0])
+        except Exception as e:
+            logger.error(f"SMA calculation error: {e}")
+            return prices[-1] if len(prices) > 0 else 0.0
+    
+    def evaluate_signals(self, symbol, current_price, rsi, sma_20):
+        """Apply the RSI and price-vs-SMA20 rules to one symbol"""
+        return signal_rules.evaluate(symbol, current_price, rsi, sma_20)
+    
+    def update_indicators(self, symbol, data):
+        """Bring a symbol's rolling state up to date and return (price, rsi, sma_20)
+
+        Completed bars are committed to the state once; the newest bar may
+        still be forming, so it is only peeked at and never committed.
+        """
+        closes = data['Close'].to_numpy(dtype=float)
+        bars = bar_labels(data.index)
+        
+        with self.state_lock:
+            state, price, rsi, sma_20 = advance(self.indicator_states.get(symbol), bars, closes)
+            self.indicator_states[symbol] = state
+        
+        return price, rsi, sma_20
+    
+    def analyze_stock(self, symbol, data=None):
+        """Analyze single stock for signals"""
+        try:
+            if data is None:
+                data = self.fetch_stock_data(symbol)
+            if data is None or data.empty or len(data) < 14:
+                return None
+            
+            current_price, rsi, sma_20 = self.update_indicators(symbol, data)
+            signals = self.evaluate_signals(symbol, current_price, rsi, sma_20)
+            
+            self.state_store.save({symbol: self.indicator_states[symbol]})
+            return signals
+            
+        except Exception as e:
+            logger.error(f"Error analyzing {symbol}: {e}")
+            return None
+    
+    def analyze_frames(self, frames):
+        """Update indicator state for all fetched symbols and apply the rules"""
+        if self.indicator_pool is not None:
+            try:
+                return self.analyze_frames_parallel(frames)
+            except Exception as e:
+                logger.error(f"Process pool analysis failed, falling back to in-process: {e}")
+        
+        results = {}
+        updated = {}
+        
+        for symbol, data in frames.items():
+            if data is None or data.empty or len(data) < 14:
+                EMPTY_FRAMES.inc()
+                continue
+            try:
+                started = time.perf_counter()
+                current_price, rsi, sma_20 = self.update_indicators(symbol, data)
+                results[symbol] = self.evaluate_signals(symbol, current_price, rsi, sma_20)
+                updated[symbol] = self.indicator_states[symbol]
+                SYMBOL_SECONDS.set(time.perf_counter() - started, stage='indicators', symbol=symbol)
+            except Exception as e:
+                logger.error(f"Error analyzing {symbol}: {e}")
+        
+        with STAGE_SECONDS.time(stage='state_save'):
+            self.state_store.save(updated)
+        return results
+    
+    def analyze_frames_parallel(self, frames):
+        """Compute indicators and rules for all frames in the process pool
+
+        Each symbol's rolling state is sent to the workers with its bars and
+        the advanced state is committed back, so signals match the in-process
+        path.
+        """
+        usable = {
+            symbol: data for symbol, data in frames.items()
+            if data is not None and not data.empty and len(data) >= 14
+        }
+        closes = {symbol: data['Close'].to_numpy(dtype=float) for symbol, data in usable.items()}
+        bars = {symbol: bar_labels(data.index) for symbol, data in usable.items()}
+        with self.state_lock:
+            states = {symbol: self.indicator_states.get(symbol) for symbol in usable}
+        
+        evaluated = self.indicator_pool.evaluate(closes, bars, states)
+        
+        updated = {symbol: values[4] for symbol, values in evaluated.items()}
+        with self.state_lock:
+            self.indicator_states.update(updated)
+        with STAGE_SECONDS.time(stage='state_save'):
+            self.state_store.save(updated)
+        return {symbol: values[3] for symbol, values in evaluated.items()}
+    
+    def save_signals_to_db(self, signals):
+        """Save signals to database"""
+        if not signals:
+            return
+            
+        try:
+            with STAGE_SECONDS.time(stage='db_write'):
+                db.execute_many('''
+                    INSERT INTO analysis_results (symbol, signal_type, strength, price, timestamp, description)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [(signal['symbol'], signal['signal_type'], signal['strength'],
+                       signal['price'], db.format_timestamp(signal['timestamp']), signal['description']) for signal in signals])
+            stats_cache.invalidate()
+            
+            logger.info(f"Saved {len(signals)} signals to database")
+        except Exception as e:
+            logger.error(f"Database save error: {e}")
+    
+    def run_retention(self):
+        """Roll up old signals at most once per day"""
+        today = datetime.now().date()
+        if self.last_rollup_day == today:
+            return
+        
+        try:
+            db.rollup_signals(self.retention_days)
+            self.last_rollup_day = today
+        except Exception as e:
+            logger.error(f"Signal retention error: {e}")
+    
+    def send_telegram_message(self, message, coalesce=True):
+        """Queue a message to the configured chat
+
+        Signal alerts still waiting in the queue are merged into one message.
+        """
+        if not self.telegram_token or not self.telegram_chat_id:
+            logger.warning("Telegram not configured - skipping notification")
+            return False
+            
+        try:
+            self.outbound.send(self.telegram_chat_id, message, coalesce=coalesce)
+            return True
+        except Exception as e:
+            logger.error(f"Error sending Telegram message: {e}")
+            return False
+    
+    def format_signals_message(self, all_signals, cleared=None):
+        """Format signals, and optionally signals that stopped firing, for Telegram"""
+        if not all_signals and not cleared:
+            return "🔍 <b>Analysis Complete</b>\n\nNo significant signals detected at this time."
+        
+        message = "🚀 <b>Nifty 50 Analysis</b>\n\n"
+        
+        buy_signals = [s for s in all_signals if s['signal_type'] == 'BUY']
+        sell_signals = [s for s in all_signals if s['signal_type'] == 'SELL']
+        
+        if buy_signals:
+            message += "📈 <b>BUY SIGNALS:</b>\n"
+            for signal in buy_signals[:3]:
+                symbol_clean = signal['symbol'].replace(".NS", "")
+                message += f"• <b>{symbol_clean}</b> - ₹{signal['price']:.2f}\n"
+                message += f"  📝 {signal['description']} ({signal['strength']}){self.transition_label(signal)}\n\n"
+        
+        if sell_signals:
+            message += "📉 <b>SELL SIGNALS:</b>\n"
+            for signal in sell_signals[:3]:
+                symbol_clean = signal['symbol'].replace(".NS", "")
+                message += f"• <b>{symbol_clean}</b> - ₹{signal['price']:.2f}\n"
+                message += f"  📝 {signal['description']} ({signal['strength']}){self.transition_label(signal)}\n\n"
+        
+        if cleared:
+            message += "✅ <b>CLEARED:</b>\n"
+            for entry in cleared[:5]:
+                symbol_clean = entry['symbol'].replace(".NS", "")
+                message += f"• <b>{symbol_clean}</b> - {entry['signal_type']} {entry['description']}\n"
+            if len(cleared) > 5:
+                message += f"  <i>and {len(cleared) - 5} more</i>\n"
+            message += "\n"
+        
+        message += f"⏰ <i>Updated: {datetime.now().strftime('%d/%m/%Y %H:%M IST')}</i>\n"
+        cleared_note = f", {len(cleared)} cleared" if cleared else ""
+        message += f"📊 <i>Total: {len(buy_signals)} BUY, {len(sell_signals)} SELL{cleared_note}</i>"
+        
+        return message
+    
+    def transition_label(self, signal):
+        return " ⬆️ strengthened" if signal.get('transition') == 'strengthened' else ""
+    
+    def scan_symbols(self, symbols):
+        """Fetch and analyze one chunk of the universe; returns signals by symbol"""
+        with STAGE_SECONDS.time(stage='fetch'):
+            frames = self.fetch_stock_data_batch(symbols)
+        logger.info(f"Fetched data for {len(frames)}/{len(symbols)} stocks")
+        
+        # Symbols missing from the batch are fetched individually in the pool
+        missing = [s for s in symbols if s not in frames]
+        if missing:
+            with STAGE_SECONDS.time(stage='fetch_fallback'):
+                results = run_concurrently(missing, self.fetch_stock_data, max_workers=self.max_workers)
+            for result in results:
+                SYMBOL_SECONDS.set(result.elapsed, stage='fetch_fallback', symbol=result.item)
+                if result.error is not None:
+                    logger.error(f"Error fetching {result.item}: {result.error}")
+                elif result.result is not None:
+                    frames[result.item] = result.result
+            
+            slowest = sorted(results, key=lambda r: r.elapsed, reverse=True)[:3]
+            logger.info("Slowest fallback fetches: " + ", ".join(f"{r.item} {r.elapsed:.2f}s" for r in slowest))
+        
+        with STAGE_SECONDS.time(stage='indicators'):
+            return self.analyze_frames(frames)
+    
+    def analyze_nifty_50(self):
+        """Main analysis function"""
+        with STAGE_SECONDS.time(stage='cycle'):
+            return self.run_scan()
+    
+    def run_scan(self):
+        """Scan the universe within the cycle budget, then store, alert and publish"""
+        logger.info("Starting Nifty 50 analysis...")
+        all_signals = []
+        started = time.monotonic()
+        
+        signals_by_symbol = {}
+        scanned = 0
+        chunks = 0
+        pending = self.universe.pending()
+        for chunk in chunked(pending, self.scan_chunk_size):
+            elapsed = time.monotonic() - started
+            if self.cycle_budget and chunks and elapsed + elapsed / chunks > self.cycle_budget:
+                logger.warning(
+                    f"Cycle budget of {self.cycle_budget:.0f}s reached after {scanned} symbols; "
+                    f"{len(pending) - scanned} carried over to the next cycle"
+                )
+                break
+            signals_by_symbol.update(self.scan_symbols(chunk))
+            scanned += len(chunk)
+            chunks += 1
+        self.universe.advance(scanned)
+        processed = len(signals_by_symbol)
+        
+        # Walk the universe order so message formatting is deterministic
+        signals_by_symbol = {s: signals_by_symbol[s] for s in self.nifty_symbols if s in signals_by_symbol}
+        for signals in signals_by_symbol.values():
+            all_signals.extend(signals or [])
+        
+        # Only signals that started, strengthened or cleared are stored and alerted
+        changed, cleared = self.signal_state.apply(signals_by_symbol)
+        
+        logger.info(
+            f"Analysis complete. Found {len(all_signals)} active signals from {processed} stocks: "
+            f"{len(changed)} new or strengthened, {len(cleared)} cleared."
+        )
+        for signal in all_signals:
+            SIGNALS_GENERATED.inc(signal_type=signal['signal_type'], strength=signal['strength'])
+        for signal in changed:
+            SIGNAL_TRANSITIONS.inc(transition=signal['transition'])
+        if cleared:
+            SIGNAL_TRANSITIONS.inc(len(cleared), transition='cleared')
+        
+        if changed or cleared:
+            self.save_signals_to_db(changed)
+            with STAGE_SECONDS.time(stage='format'):
+                message = self.format_signals_message(changed, cleared)
+            self.send_telegram_message(message)
+        else:
+            logger.info("No signal changes this cycle")
+        
+        with STAGE_SECONDS.time(stage='publish'):
+            self.publish_snapshot()
+        self.run_retention()
+        startup_report.mark('first_analysis')
+        return all_signals
+
+def run_analysis_loop(analyzer, run_on_start=True):
+    """Run analysis in background
+
+    By default runs follow the NSE session (see scheduler.AdaptiveScheduler);
+    SCHEDULE_MODE=fixed restores a plain ANALYSIS_INTERVAL_SECONDS loop.
+    """
+    logger.info("Starting background analysis loop...")
+    
+    if run_on_start:
+        try:
+            logger.info("Running initial analysis...")
+            analyzer.run_analysis_cycle()
+        except Exception as e:
+            logger.error(f"Initial analysis error: {e}")
+    
+    fixed_interval = float(os.getenv('ANALYSIS_INTERVAL_SECONDS', '900'))
+    scheduler = None if os.getenv('SCHEDULE_MODE', 'market') == 'fixed' else AdaptiveScheduler.from_env()
+    
+    while True:
+        try:
+            if scheduler is None:
+                time.sleep(fixed_interval)
+            else:
+                next_run = scheduler.next_run()
+                logger.info(f"Next analysis run at {next_run.strftime('%d/%m/%Y %H:%M:%S IST')}")
+                
+                # Sleep in short steps so clock jumps or host suspend do not delay the run
+                while now_ist() < next_run:
+                    time.sleep(min((next_run - now_ist()).total_seconds(), 60))
+            
+            analyzer.run_analysis_cycle()
+            
+        except Exception as e:
+            logger.error(f"Analysis loop error: {e}")
+            time.sleep(60)
@@ -0,0 +1,186 @@
+"""Vectorized backtest of the live signal rules over daily history.
+
+Indicators for the whole universe are computed as one symbols x days matrix
+and every rule is evaluated on every day at once, then each firing is scored
+by the forward return over a set of holding horizons.
+
+    python backtest.py --years 10 --horizons 1,5,10,20
+"""
+import sys
+import json
+import time
+import argparse
+import logging
+
+import numpy as np
+
+import indicators
+import signal_rules
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZONS = (1, 5, 10, 20)
+
+
+def close_matrix(frames):
+    """Align per-symbol frames on a shared date index
+
+    Returns (symbols, dates, matrix) with one row per symbol, dates as
+    datetime64[D] and NaN for days a symbol has no bar.
+    """
+    import pandas as pd
+
+    closes = pd.concat({symbol: data['Close'] for symbol, data in frames.items()}, axis=1).sort_index()
+    index = closes.index.tz_localize(None) if closes.index.tz is not None else closes.index
+    return list(closes.columns), np.asarray(index, dtype='datetime64[D]'), closes.to_numpy(dtype=np.float64).T
+
+
+def load_history(symbols, years=10, provider=None):
+    """Daily history for the backtest from the named (or configured) market data provider"""
+    from market_data import get_provider
+
+    return get_provider(provider).download_batch(symbols, period=f"{years}y")
+
+
+def load_close_matrix(symbols, years=10, provider=None):
+    """(symbols, dates, close matrix) for the backtest
+
+    The history store is read straight into the matrix through memory maps;
+    other providers go through per-symbol frames.
+    """
+    from market_data import get_provider, period_days, MARKET_DATA_PROVIDER
+
+    if (provider or MARKET_DATA_PROVIDER) == 'store':
+        store = get_provider('store').store
+        last_day = np.datetime64('today', 'D').astype(np.int64)
+        found, days, matrix = store.load_matrix(symbols, start_day=last_day - period_days(f"{years}y"))
+        return found, days.astype('datetime64[D]'), matrix
+
+    frames = load_history(symbols, years, provider)
+    if not frames:
+        return [], np.empty(0, dtype='datetime64[D]'), np.empty((0, 0))
+    return close_matrix(frames)
+
+
+def forward_returns(matrix, horizon):
+    """Return over the next horizon bars, NaN where the future is unknown"""
+    result = np.full(matrix.shape, np.nan)
+    if matrix.shape[1] > horizon:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[:, :-horizon] = matrix[:, horizon:] / matrix[:, :-horizon] - 1
+    return result
+
+
+def rule_masks(matrix, rsi_period=14, sma_period=20):
+    """Boolean symbols x days mask of where each rule fires, using live-rule rounding"""
+    rsi = np.round(indicators.rsi(matrix, rsi_period), 2)
+    price_vs_sma = indicators.price_vs_sma(matrix, sma_period)
+    with np.errstate(invalid='ignore'):
+        return signal_rules.evaluate_matrix(rsi, price_vs_sma)
+
+
+def score(masks, matrix, horizons=DEFAULT_HORIZONS):
+    """Signal count, hit rate and mean forward return per rule and horizon
+
+    A BUY hits when the forward return is positive and a SELL when it is
+    negative; 'edge' is the mean return in the signal's direction.
+    """
+    returns = {horizon: forward_returns(matrix, horizon) for horizon in horizons}
+    report = []
+
+    for name, signal_type, strength in signal_rules.RULES:
+        mask = masks[name]
+        direction = 1.0 if signal_type == 'BUY' else -1.0
+        row = {
+            'rule': name,
+            'signal_type': signal_type,
+            'strength': strength,
+            'signals': int(mask.sum()),
+            'horizons': {}
+        }
+
+        for horizon, forward in returns.items():
+            values = forward[mask & ~np.isnan(forward)]
+            if len(values) == 0:
+                row['horizons'][horizon] = {'count': 0, 'hit_rate': None, 'mean_return': None, 'edge': None}
+                continue
+            row['horizons'][horizon] = {
+                'count': int(len(values)),
+                'hit_rate': round(float(np.mean(values * direction > 0)), 4),
+                'mean_return': round(float(np.mean(values)), 6),
+                'edge': round(float(np.mean(values * direction)), 6)
+            }
+        report.append(row)
+
+    return report
+
+
+def run_backtest(frames, horizons=DEFAULT_HORIZONS, rsi_period=14, sma_period=20):
+    """Backtest every rule over the given per-symbol frames"""
+    return run_backtest_matrix(*close_matrix(frames), horizons, rsi_period, sma_period)
+
+
+def run_backtest_matrix(symbols, dates, matrix, horizons=DEFAULT_HORIZONS, rsi_period=14, sma_period=20):
+    """Backtest every rule over an aligned symbols x days close matrix"""
+    masks = rule_masks(matrix, rsi_period, sma_period)
+    return {
+        'symbols': len(symbols),
+        'days': len(dates),
+        'start': str(dates[0]) if len(dates) else None,
+        'end': str(dates[-1]) if len(dates) else None,
+        'rules': score(masks, matrix, horizons)
+    }
+
+
+def format_report(result):
+    lines = [f"{result['symbols']} symbols, {result['days']} days ({result['start']} to {result['end']})", ""]
+    for row in result['rules']:
+        lines.append(f"{row['signal_type']} {row['strength']} {row['rule']}: {row['signals']} signals")
+        for horizon, stats in row['horizons'].items():
+            if stats['count']:
+                lines.append(
+                    f"  {horizon:>3}d  hit {stats['hit_rate']:.1%}  "
+                    f"mean {stats['mean_return']:+.2%}  edge {stats['edge']:+.2%}"
+                )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from universe import load_universe
+
+    parser = argparse.ArgumentParser(description="Backtest the RSI/SMA signal rules")
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--horizons', default=','.join(map(str, DEFAULT_HORIZONS)),
+                        help="Comma-separated forward horizons in trading days")
+    parser.add_argument('--universe', default=None, help="Universe list name (default: UNIVERSE)")
+    parser.add_argument('--provider', default=None, help="yfinance, replay, synthetic or store (default: MARKET_DATA_PROVIDER)")
+    parser.add_argument('--json', dest='json_path', help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    horizons = tuple(int(h) for h in args.horizons.split(','))
+    symbols = load_universe(args.universe)
+
+    started = time.perf_counter()
+    found, dates, matrix = load_close_matrix(symbols, args.years, args.provider)
+    loaded = time.perf_counter()
+    if not found:
+        logger.error("No history loaded")
+        return 1
+
+    result = run_backtest_matrix(found, dates, matrix, horizons)
+    finished = time.perf_counter()
+    result['load_seconds'] = round(loaded - started, 3)
+    result['backtest_seconds'] = round(finished - loaded, 3)
+
+    print(format_report(result))
+    print(f"\nLoaded in {result['load_seconds']:.1f}s, backtested in {result['backtest_seconds']:.2f}s")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
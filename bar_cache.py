@@ -0,0 +1,101 @@
+import logging
+from datetime import datetime
+
+import pandas as pd
+
+import db
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class BarCache:
+    """Daily OHLCV bars cached in the price_data table, keyed by symbol and date
+
+    The table is created by db.MIGRATIONS.
+    """
+
+    def recent_closes(self, symbols, count=2):
+        """Return the newest cached (date, close) pairs for each symbol, newest first"""
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+
+        try:
+            placeholders = ','.join('?' for _ in symbols)
+            results = db.fetch_all(f'''
+                SELECT symbol, date, close FROM (
+                    SELECT symbol, date, close,
+                           ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY date DESC) AS position
+                    FROM price_data
+                    WHERE symbol IN ({placeholders})
+                )
+                WHERE position <= ?
+                ORDER BY symbol, date DESC
+            ''', symbols + [count])
+        except Exception as e:
+            logger.error(f"Bar cache lookup error: {e}")
+            return {}
+
+        closes = {}
+        for symbol, date, close in results:
+            closes.setdefault(symbol, []).append((date, close))
+        return closes
+
+    def clear(self, symbol):
+        """Drop every cached bar of a symbol, e.g. after its history was re-adjusted"""
+        try:
+            with db.transaction() as cursor:
+                cursor.execute('DELETE FROM price_data WHERE symbol = ?', (symbol,))
+        except Exception as e:
+            logger.error(f"Bar cache clear error for {symbol}: {e}")
+
+    def store(self, symbol, data):
+        """Insert or refresh the bars of a frame"""
+        if data is None or data.empty:
+            return
+
+        now = datetime.now()
+        rows = [
+            (symbol, index.strftime('%Y-%m-%d'),
+             float(row['Open']), float(row['High']), float(row['Low']), float(row['Close']),
+             int(row['Volume']) if pd.notna(row['Volume']) else 0, db.format_timestamp(now))
+            for index, row in data.iterrows()
+            if pd.notna(row['Close'])
+        ]
+
+        try:
+            db.execute_many('''
+                INSERT INTO price_data (symbol, date, open, high, low, close, volume, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (symbol, date) DO UPDATE SET
+                    open = excluded.open,
+                    high = excluded.high,
+                    low = excluded.low,
+                    close = excluded.close,
+                    volume = excluded.volume,
+                    timestamp = excluded.timestamp
+            ''', rows)
+        except Exception as e:
+            logger.error(f"Bar cache store error for {symbol}: {e}")
+
+    def load(self, symbol, limit=30):
+        """Load the newest cached bars for a symbol, oldest first"""
+        try:
+            results = db.fetch_all('''
+                SELECT date, open, high, low, close, volume FROM price_data
+                WHERE symbol = ?
+                ORDER BY date DESC
+                LIMIT ?
+            ''', (symbol, limit))
+        except Exception as e:
+            logger.error(f"Bar cache load error for {symbol}: {e}")
+            return None
+
+        if not results:
+            return None
+
+        results.reverse()
+        index = pd.DatetimeIndex([row[0] for row in results], name='Date')
+        return pd.DataFrame([row[1:] for row in results], index=index, columns=OHLCV_COLUMNS)
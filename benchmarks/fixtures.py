@@ -0,0 +1,76 @@
+"""Recorded OHLCV fixtures for benchmarks.
+
+Record real bars once with
+
+    python -m benchmarks.fixtures record --period 2y
+
+and every benchmark run replays them through market_data.ReplayProvider
+instead of calling Yahoo. Without recorded fixtures the deterministic
+SyntheticProvider is used instead.
+"""
+import os
+import sys
+import argparse
+import logging
+
+from market_data import MemoryProvider, ReplayProvider, SyntheticProvider, get_provider
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def recorded_provider(directory=FIXTURE_DIR):
+    """ReplayProvider over the fixture directory, or None when nothing is recorded"""
+    provider = ReplayProvider(directory)
+    return provider if provider.symbols() else None
+
+
+def universe_provider(size, directory=FIXTURE_DIR):
+    """(symbols, provider) for a universe of size symbols, reusing recorded bars where possible
+
+    Recorded symbols are repeated under suffixed names (RELIANCE_2.NS) to
+    reach larger universe sizes, so a 50-symbol recording serves 500.
+    """
+    recorded = recorded_provider(directory)
+    if recorded is None:
+        symbols = [f"SYN{i:03d}.NS" for i in range(size)]
+        return symbols, SyntheticProvider(days=500)
+
+    names = recorded.symbols()
+    frames = {}
+    for i in range(size):
+        base = names[i % len(names)]
+        copy = i // len(names)
+        symbol = base if copy == 0 else base.replace('.', f"_{copy + 1}.", 1)
+        frames[symbol] = recorded.frame(base)
+    return list(frames), MemoryProvider(frames)
+
+
+def record(symbols, period, directory=FIXTURE_DIR, fmt='csv'):
+    frames = get_provider('yfinance').download_batch(symbols, period=period)
+    ReplayProvider(directory).record(frames, fmt)
+    print(f"Recorded {len(frames)}/{len(symbols)} symbols to {directory}")
+    return frames
+
+
+def main(argv=None):
+    from universe import load_universe
+
+    parser = argparse.ArgumentParser(description="Record market-data fixtures for benchmarks")
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help="Download bars for the universe into the fixture directory")
+    rec.add_argument('--period', default='2y')
+    rec.add_argument('--universe', default=None)
+    rec.add_argument('--dir', default=FIXTURE_DIR)
+    rec.add_argument('--format', default='csv', choices=['csv', 'parquet'])
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        record(load_universe(args.universe), args.period, args.dir, args.format)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
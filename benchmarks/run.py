@@ -0,0 +1,279 @@
+"""Benchmark the analysis pipeline and the web API against replayed market data.
+
+    python -m benchmarks.run --sizes 15,50,500 --output benchmarks/report.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+Pipeline stages are timed on a fresh SQLite database per universe size, with
+bars replayed from recorded fixtures (or generated) instead of fetched from
+Yahoo. Routes are exercised through Flask's test client against a database
+seeded with a year of signals, so the numbers cover request handling but not
+the WSGI server or network.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import logging
+from datetime import datetime, timedelta
+
+# The web tier must not start its own analyzer, and the benchmark must not
+# message a real chat
+os.environ['ANALYZER_MODE'] = 'web'
+os.environ.pop('TELEGRAM_BOT_TOKEN', None)
+os.environ.pop('TELEGRAM_CHAT_ID', None)
+
+from benchmarks.fixtures import universe_provider, recorded_provider  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (15, 50, 500)
+REPORT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'report.json')
+
+
+def timed(func, repeat=1):
+    """Run func repeat times; returns (timing summary, last result)"""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - started)
+    return {
+        'runs': repeat,
+        'min_seconds': round(min(durations), 6),
+        'median_seconds': round(statistics.median(durations), 6)
+    }, result
+
+
+def use_database(path):
+    """Point the shared connection pool at a fresh database file"""
+    import db
+    db.close_all()
+    db.DB_PATH = path
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def bench_pipeline(size, workdir, repeat=3):
+    """Time each analysis stage for a universe of size symbols"""
+    from analyzer import SimpleNiftyAnalyzer
+    from universe import UniverseRotation
+
+    use_database(os.path.join(workdir, f"pipeline_{size}.db"))
+    symbols, provider = universe_provider(size)
+
+    analyzer = SimpleNiftyAnalyzer()
+    analyzer.provider = provider
+    analyzer.nifty_symbols = symbols
+    analyzer.universe = UniverseRotation(symbols)
+    analyzer.cycle_budget = 0
+
+    stages = {}
+    stages['fetch_cold'], _ = timed(lambda: analyzer.fetch_stock_data_batch(symbols))
+    stages['fetch_warm'], cached = timed(lambda: analyzer.fetch_stock_data_batch(symbols), repeat)
+
+    def rebuild_indicators():
+        analyzer.indicator_states.clear()
+        return {symbol: analyzer.update_indicators(symbol, data) for symbol, data in cached.items()}
+
+    stages['indicators_cold'], values = timed(rebuild_indicators)
+    stages['indicators_warm'], values = timed(
+        lambda: {symbol: analyzer.update_indicators(symbol, data) for symbol, data in cached.items()}, repeat)
+
+    closes = {symbol: data['Close'].to_numpy(dtype=float) for symbol, data in cached.items()}
+    stages['calculate_rsi_sma'], _ = timed(
+        lambda: [(analyzer.calculate_rsi(c), analyzer.calculate_sma(c)) for c in closes.values()], repeat)
+
+    def evaluate_rules():
+        signals = []
+        for symbol, (price, rsi, sma_20) in values.items():
+            signals.extend(analyzer.evaluate_signals(symbol, price, rsi, sma_20) or [])
+        return signals
+
+    stages['rules'], signals = timed(evaluate_rules, repeat)
+    stages['analyze_stock'], _ = timed(
+        lambda: [analyzer.analyze_stock(symbol, data) for symbol, data in cached.items()], repeat)
+    stages['db_write'], _ = timed(lambda: analyzer.save_signals_to_db(signals), repeat)
+    stages['format_message'], _ = timed(lambda: analyzer.format_signals_message(signals), repeat)
+    stages['full_cycle'], _ = timed(analyzer.analyze_nifty_50, repeat)
+
+    return {'symbols': len(symbols), 'signals': len(signals), 'stages': stages}
+
+
+def seed_signals(symbols, days=365, per_day=2, seed=0):
+    """Insert a year of plausible signals, ending today, and an active signal per symbol"""
+    import db
+    from signal_rules import RULES
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    rows = []
+    for day in range(days):
+        for symbol in symbols:
+            for _ in range(per_day):
+                _, signal_type, strength = rng.choice(RULES)
+                moment = now - timedelta(days=day, minutes=rng.randint(0, 360))
+                rows.append((symbol, signal_type, strength, round(rng.uniform(100, 3000), 2),
+                             db.format_timestamp(moment), 'Benchmark signal'))
+    db.execute_many('''
+        INSERT INTO analysis_results (symbol, signal_type, strength, price, timestamp, description)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', rows)
+
+    # The latest-signals routes serve the active set, one direction per symbol
+    active = []
+    for symbol in symbols:
+        rule, signal_type, strength = rng.choice(RULES)
+        active.append((symbol, signal_type, rule, strength, round(rng.uniform(100, 3000), 2),
+                       'Benchmark signal', db.format_timestamp(now), db.format_timestamp(now)))
+    db.execute_many('''
+        INSERT INTO signal_state (symbol, signal_type, rule, strength, price, description, since, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', active)
+    return len(rows)
+
+
+def bench_route(client, path, requests, headers=None, before=None):
+    latencies = []
+    status = None
+    for _ in range(requests):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        response = client.get(path, headers=headers or {})
+        latencies.append(time.perf_counter() - started)
+        status = response.status_code
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'requests': requests,
+        'status': status,
+        'requests_per_second': round(requests / total, 1) if total else None,
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 3),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3)
+    }
+
+
+def bench_routes(workdir, symbols=50, requests=200):
+    """Throughput of the read API over a database holding a year of signals"""
+    from analyzer import SimpleNiftyAnalyzer
+
+    use_database(os.path.join(workdir, 'routes.db'))
+    SimpleNiftyAnalyzer()
+    seeded = seed_signals([f"SYM{i:03d}.NS" for i in range(symbols)])
+
+    import app
+    from stats import stats_cache
+    from snapshot import snapshot_store
+
+    client = app.app.test_client()
+    snapshot = app.current_snapshot()
+
+    def drop_snapshot():
+        # Forces the route to rebuild the snapshot from the database
+        snapshot_store.current = None
+
+    routes = {
+        'latest_signals': bench_route(client, '/api/latest-signals', requests),
+        'latest_signals_not_modified': bench_route(
+            client, '/api/latest-signals', requests, headers={'If-None-Match': f'"{snapshot.etag}"'}),
+        'latest_signals_uncached': bench_route(
+            client, '/api/latest-signals', requests, before=drop_snapshot),
+        'stats': bench_route(client, '/api/stats', requests),
+        'stats_uncached': bench_route(client, '/api/stats', requests, before=stats_cache.invalidate),
+        'stats_breakdown': bench_route(client, '/api/stats?breakdown=symbol,strength', requests,
+                                       before=stats_cache.invalidate),
+        'health': bench_route(client, '/health', requests)
+    }
+    return {'seeded_signals': seeded, 'routes': routes}
+
+
+def flatten(report, prefix=''):
+    """Map 'pipeline.50.stages.rules' style paths to comparable timings"""
+    values = {}
+    for key, value in report.items():
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            if 'median_seconds' in value:
+                values[path] = value['median_seconds']
+            elif 'p50_ms' in value:
+                values[path] = value['p50_ms'] / 1000
+            else:
+                values.update(flatten(value, path))
+    return values
+
+
+def compare(old, new):
+    """Print the new/old timing ratio for every stage present in both reports"""
+    old_values = flatten({'pipeline': old.get('pipeline', {}), 'api': old.get('api', {})})
+    new_values = flatten({'pipeline': new.get('pipeline', {}), 'api': new.get('api', {})})
+    print(f"\nCompared with {old.get('revision') or 'previous report'}:")
+    for path, value in new_values.items():
+        before = old_values.get(path)
+        if before:
+            print(f"  {path:<55} {before * 1000:>10.3f}ms -> {value * 1000:>10.3f}ms  x{value / before:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline and web API")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated universe sizes")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per warm stage")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per API route")
+    parser.add_argument('--output', default=REPORT_PATH)
+    parser.add_argument('--compare', help="Earlier report to compare against")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    report = {
+        'revision': git_revision(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'fixtures': 'recorded' if recorded_provider() else 'synthetic',
+        'pipeline': {},
+        'api': {}
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in (int(s) for s in args.sizes.split(',')):
+            print(f"Pipeline, {size} symbols...")
+            report['pipeline'][size] = bench_pipeline(size, workdir, args.repeat)
+        print("API routes...")
+        report['api'] = bench_routes(workdir, requests=args.requests)
+        use_database(os.path.join(workdir, 'closed.db'))
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for size, result in report['pipeline'].items():
+        print(f"\n{size} symbols ({result['signals']} signals):")
+        for stage, timing in result['stages'].items():
+            print(f"  {stage:<20} {timing['median_seconds'] * 1000:>10.2f}ms")
+    print(f"\nAPI ({report['api']['seeded_signals']} seeded signals):")
+    for route, result in report['api']['routes'].items():
+        print(f"  {route:<30} {result['requests_per_second']:>9} req/s  p95 {result['p95_ms']}ms")
+    print(f"\nReport written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
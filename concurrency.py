@@ -0,0 +1,151 @@
+import time
+import threading
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+TaskResult = namedtuple('TaskResult', ['item', 'result', 'error', 'elapsed'])
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take tokens if available without blocking"""
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1):
+        """Block until tokens are available"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def run_concurrently(items, func, max_workers=4):
+    """Run func over items in a bounded thread pool, keeping input order"""
+    items = list(items)
+
+    def timed(item):
+        started = time.perf_counter()
+        try:
+            return TaskResult(item, func(item), None, time.perf_counter() - started)
+        except Exception as e:
+            return TaskResult(item, None, e, time.perf_counter() - started)
+
+    if max_workers <= 1 or len(items) <= 1:
+        return [timed(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(timed, items))
+
+
+class SingleFlight:
+    """Collapses concurrent calls into one run whose result every caller shares
+
+    A call made within max_age seconds of the last successful run reuses
+    that result instead of running again.
+    """
+
+    def __init__(self, name='call'):
+        self.name = name
+        self.lock = threading.Lock()
+        self.inflight = None
+        self.last_result = None
+        self.last_finished = None
+
+    def fresh_result(self, max_age):
+        if max_age and self.last_finished is not None and time.monotonic() - self.last_finished <= max_age:
+            return True, self.last_result
+        return False, None
+
+    def _join_or_lead(self, max_age, callback=None):
+        with self.lock:
+            fresh, result = self.fresh_result(max_age)
+            if fresh:
+                return 'fresh', result
+
+            if self.inflight is not None:
+                if callback is not None:
+                    self.inflight['callbacks'].append(callback)
+                return 'joined', self.inflight
+
+            self.inflight = {
+                'done': threading.Event(),
+                'result': None,
+                'error': None,
+                'callbacks': [callback] if callback is not None else []
+            }
+            return 'leader', self.inflight
+
+    def _run(self, call, func):
+        try:
+            call['result'] = func()
+        except Exception as e:
+            call['error'] = e
+            logger.error(f"{self.name} failed: {e}")
+        finally:
+            with self.lock:
+                self.inflight = None
+                if call['error'] is None:
+                    self.last_result = call['result']
+                    self.last_finished = time.monotonic()
+            call['done'].set()
+
+        for callback in call['callbacks']:
+            try:
+                callback(call['result'], call['error'])
+            except Exception as e:
+                logger.error(f"{self.name} callback error: {e}")
+
+    def do(self, func, max_age=None):
+        """Run func, or wait for the run already in progress, and return its result"""
+        role, call = self._join_or_lead(max_age)
+        if role == 'fresh':
+            return call
+        if role == 'leader':
+            self._run(call, func)
+        else:
+            call['done'].wait()
+
+        if call['error'] is not None:
+            raise call['error']
+        return call['result']
+
+    def submit(self, func, callback, max_age=None):
+        """Like do(), but returns at once and calls callback(result, error) when done
+
+        Only a new run starts a thread; callers joining a run just register
+        their callback.
+        """
+        role, call = self._join_or_lead(max_age, callback)
+        if role == 'fresh':
+            callback(call, None)
+        elif role == 'leader':
+            threading.Thread(target=self._run, args=(call, func), daemon=True).start()
+        return role
@@ -0,0 +1,260 @@
+import os
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.getenv('DATABASE_PATH', 'nifty_analysis.db')
+
+# Seconds a writer waits for a lock held by another process before failing
+BUSY_TIMEOUT = float(os.getenv('DATABASE_BUSY_TIMEOUT', '30'))
+
+_local = threading.local()
+_connections = {}
+_connections_lock = threading.Lock()
+_generation = 0
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version
+MIGRATIONS = [
+    # 1: indexes backing the timestamp range filters used by every reader
+    [
+        'CREATE INDEX IF NOT EXISTS idx_analysis_results_timestamp '
+        'ON analysis_results (timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_analysis_results_signal_type_timestamp '
+        'ON analysis_results (signal_type, timestamp)',
+    ],
+    # 2: per-day signal counts kept after raw rows pass the retention window
+    [
+        '''CREATE TABLE IF NOT EXISTS signal_daily_rollup (
+            day DATE,
+            symbol TEXT,
+            signal_type TEXT,
+            strength TEXT,
+            signal_count INTEGER,
+            PRIMARY KEY (day, symbol, signal_type, strength)
+        )''',
+    ],
+    # 3: active signal per symbol and direction; replaces the first per-rule
+    # layout, whose rows are dropped and rebuilt by the next cycle
+    [
+        'DROP TABLE IF EXISTS signal_state',
+        '''CREATE TABLE signal_state (
+            symbol TEXT,
+            signal_type TEXT,
+            rule TEXT,
+            strength TEXT,
+            price REAL,
+            description TEXT,
+            since DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (symbol, signal_type)
+        )''',
+    ],
+    # 4: cached daily bars keyed by (symbol, date); duplicates left by older
+    # versions would block the unique key, so they are purged once here
+    [
+        '''CREATE TABLE IF NOT EXISTS price_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT,
+            date DATE,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume INTEGER,
+            timestamp DATETIME
+        )''',
+        '''DELETE FROM price_data
+        WHERE id NOT IN (SELECT MAX(id) FROM price_data GROUP BY symbol, date)''',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_price_data_symbol_date '
+        'ON price_data (symbol, date)',
+    ],
+    # 5: rolling indicator state per symbol, serialized as JSON
+    [
+        '''CREATE TABLE IF NOT EXISTS indicator_state (
+            symbol TEXT PRIMARY KEY,
+            state TEXT,
+            updated_at DATETIME
+        )''',
+    ],
+]
+
+
+def _open_connection():
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT, check_same_thread=False)
+    # WAL lets the web and Telegram processes read while the analyzer writes
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA busy_timeout={int(BUSY_TIMEOUT * 1000)}')
+    return conn
+
+
+def _prune_dead_threads():
+    """Close connections whose owning thread has exited"""
+    alive = {thread.ident for thread in threading.enumerate()}
+    for ident in [ident for ident in _connections if ident not in alive]:
+        try:
+            _connections.pop(ident).close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled connection: {e}")
+
+
+def get_connection():
+    """Return this thread's pooled connection, opening it on first use"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or getattr(_local, 'generation', None) != _generation:
+        conn = _open_connection()
+        _local.conn = conn
+        _local.generation = _generation
+        with _connections_lock:
+            _prune_dead_threads()
+            _connections[threading.get_ident()] = conn
+    return conn
+
+
+@contextmanager
+def transaction():
+    """Yield a cursor inside a single transaction, committing on success"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        yield cursor
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def fetch_all(query, params=()):
+    """Run a read query and return all rows"""
+    cursor = get_connection().execute(query, params)
+    try:
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def fetch_one(query, params=()):
+    """Run a read query and return the first row"""
+    cursor = get_connection().execute(query, params)
+    try:
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def execute_many(query, rows):
+    """Run a statement for every row in one transaction"""
+    rows = list(rows)
+    if not rows:
+        return 0
+    with transaction() as cursor:
+        cursor.executemany(query, rows)
+    return len(rows)
+
+
+def close_all():
+    """Close every pooled connection, e.g. before forking worker processes"""
+    global _generation
+    with _connections_lock:
+        _generation += 1
+        for conn in _connections.values():
+            try:
+                conn.close()
+            except Exception as e:
+                logger.warning(f"Error closing pooled connection: {e}")
+        _connections.clear()
+
+
+def migrate():
+    """Apply pending schema migrations"""
+    conn = get_connection()
+    version = fetch_one('PRAGMA user_version')[0]
+
+    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute(f'PRAGMA user_version = {number}')
+            conn.commit()
+            logger.info(f"Applied database migration {number}")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+def format_timestamp(value):
+    """Render a datetime the way analysis_results stores it, for range comparisons"""
+    return value.isoformat(sep=' ')
+
+
+def day_start(days_ago=0):
+    """Timestamp string for local midnight, days_ago days back"""
+    midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return format_timestamp(midnight - timedelta(days=days_ago))
+
+
+def rollup_signals(retention_days):
+    """Fold signals older than the retention window into signal_daily_rollup"""
+    cutoff = day_start(retention_days)
+
+    with transaction() as cursor:
+        cursor.execute('''
+            INSERT INTO signal_daily_rollup (day, symbol, signal_type, strength, signal_count)
+            SELECT DATE(timestamp), symbol, signal_type, strength, COUNT(*)
+            FROM analysis_results
+            WHERE timestamp < ?
+            GROUP BY DATE(timestamp), symbol, signal_type, strength
+            ON CONFLICT (day, symbol, signal_type, strength) DO UPDATE SET
+                signal_count = signal_count + excluded.signal_count
+        ''', (cutoff,))
+        cursor.execute('DELETE FROM analysis_results WHERE timestamp < ?', (cutoff,))
+        removed = cursor.rowcount
+
+    if removed:
+        logger.info(f"Rolled up {removed} signals older than {retention_days} days")
+    return removed
+
+
+def latest_signals(limit=None):
+    """Currently active signals, newest first, as dicts
+
+    Read from signal_state, since analysis_results only records when a
+    signal starts; 'timestamp' is the time the signal started firing.
+    All active signals are returned unless limit is given, so dashboard
+    counts cover the whole universe.
+    """
+    results = fetch_all('''
+        SELECT symbol, signal_type, strength, price, since, description
+        FROM signal_state
+        ORDER BY since DESC
+        LIMIT ?
+    ''', (-1 if limit is None else limit,))
+
+    return [{
+        'symbol': row[0],
+        'signal_type': row[1],
+        'strength': row[2],
+        'price': row[3],
+        'timestamp': row[4],
+        'description': row[5]
+    } for row in results]
+
+
+def latest_signal_id():
+    """Cheap marker for signal writes by other processes
+
+    Combines the newest analysis_results id with the signal_state row count
+    and last update, so signals clearing also change it.
+    """
+    newest = fetch_one('SELECT MAX(id) FROM analysis_results')[0]
+    return (newest,) + tuple(fetch_one('SELECT COUNT(*), MAX(updated_at) FROM signal_state'))
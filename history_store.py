@@ -0,0 +1,189 @@
+"""Columnar on-disk daily price history, read through memory maps.
+
+Each symbol is a directory of .npy column files:
+
+    history_store/RELIANCE.NS/date.npy     int64 days since 1970-01-01
+                             /open.npy     float32 (also high, low, close)
+                             /volume.npy   int64
+
+Readers open columns with np.load(mmap_mode='r'), so only the pages a scan
+touches are read and every process shares the OS page cache instead of
+holding its own DataFrame copies.
+
+    python history_store.py import --years 10 --provider yfinance
+"""
+import os
+import sys
+import shutil
+import argparse
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HISTORY_STORE_DIR = os.getenv('HISTORY_STORE_DIR', 'history_store')
+
+PRICE_COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close'}
+COLUMN_DTYPES = {'date': np.int64, 'open': np.float32, 'high': np.float32,
+                 'low': np.float32, 'close': np.float32, 'volume': np.int64}
+
+
+def to_days(index):
+    """Bar dates (the exchange-local calendar day) as int64 days since the epoch"""
+    if getattr(index, 'tz', None) is not None:
+        index = index.tz_localize(None)
+    return np.asarray(index, dtype='datetime64[D]').astype(np.int64)
+
+
+class HistoryStore:
+    """Per-symbol column files with append-by-merge writes and memory-mapped reads"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or HISTORY_STORE_DIR
+        self.lock = threading.Lock()
+
+    def symbol_dir(self, symbol):
+        return os.path.join(self.directory, symbol)
+
+    def symbols(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.exists(os.path.join(self.directory, name, 'date.npy')))
+
+    def column(self, symbol, name):
+        """Memory-mapped column, or None when the symbol is not stored"""
+        path = os.path.join(self.symbol_dir(symbol), f"{name}.npy")
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r')
+
+    def columns(self, symbol):
+        """All columns of a symbol trimmed to a common length, or None"""
+        values = {name: self.column(symbol, name) for name in COLUMN_DTYPES}
+        if any(value is None for value in values.values()):
+            return None
+        length = min(len(value) for value in values.values())
+        return {name: value[:length] for name, value in values.items()}
+
+    def write(self, symbol, frame, replace=False):
+        """Merge bars from a DataFrame into the symbol's columns; newer values win
+
+        With replace the stored bars are dropped instead of merged, e.g. when
+        a split re-adjusted the whole history.
+        """
+        if frame is None or frame.empty:
+            return 0
+
+        incoming = {'date': to_days(frame.index)}
+        for name, source in PRICE_COLUMNS.items():
+            incoming[name] = frame[source].to_numpy(dtype=np.float32)
+        incoming['volume'] = frame['Volume'].fillna(0).to_numpy(dtype=np.int64) if 'Volume' in frame else \
+            np.zeros(len(frame), dtype=np.int64)
+
+        with self.lock:
+            existing = self.columns(symbol) if not replace else None
+            if existing is not None:
+                keep = ~np.isin(existing['date'], incoming['date'])
+                merged = {name: np.concatenate([np.asarray(existing[name])[keep], incoming[name]])
+                          for name in COLUMN_DTYPES}
+            else:
+                merged = incoming
+
+            order = np.argsort(merged['date'], kind='stable')
+            directory = self.symbol_dir(symbol)
+            os.makedirs(directory, exist_ok=True)
+            # Each column is written beside the live file and swapped in, date.npy
+            # last; readers trim columns to a common length, so a read racing an
+            # append of newer bars sees the old bars, never a torn column
+            for name, dtype in sorted(COLUMN_DTYPES.items(), key=lambda item: item[0] == 'date'):
+                path = os.path.join(directory, f"{name}.npy")
+                temp = path + '.tmp.npy'
+                np.save(temp, np.ascontiguousarray(merged[name][order], dtype=dtype))
+                os.replace(temp, path)
+        return len(frame)
+
+    def clear(self, symbol):
+        """Remove every stored column of a symbol"""
+        with self.lock:
+            shutil.rmtree(self.symbol_dir(symbol), ignore_errors=True)
+
+    def write_frames(self, frames):
+        return sum(self.write(symbol, frame) for symbol, frame in frames.items())
+
+    def frame(self, symbol, start_day=None, limit=None):
+        """Bars for one symbol as a DataFrame indexed by IST dates, or None"""
+        import pandas as pd
+
+        columns = self.columns(symbol)
+        if columns is None:
+            return None
+        dates = columns['date']
+        first = int(np.searchsorted(dates, start_day)) if start_day is not None else 0
+        if limit is not None:
+            first = max(first, len(dates) - limit)
+
+        index = pd.DatetimeIndex(np.asarray(dates[first:]).astype('datetime64[D]')).tz_localize('Asia/Kolkata')
+        data = {source: np.asarray(columns[name][first:], dtype=np.float64) for name, source in PRICE_COLUMNS.items()}
+        data['Volume'] = np.asarray(columns['volume'][first:])
+        return pd.DataFrame(data, index=index)
+
+    def load_matrix(self, symbols=None, field='close', start_day=None):
+        """Align one field for many symbols into a symbols x days float64 matrix
+
+        Returns (symbols, days, matrix) where days are int64 days since the
+        epoch and missing bars are NaN. Only the date and field columns are
+        mapped, so a 10-year scan reads a fraction of the store.
+        """
+        symbols = list(symbols) if symbols is not None else self.symbols()
+        found = []
+        dates_list = []
+        values_list = []
+        for symbol in symbols:
+            dates = self.column(symbol, 'date')
+            if dates is None:
+                continue
+            first = int(np.searchsorted(dates, start_day)) if start_day is not None else 0
+            values = self.column(symbol, field)
+            length = min(len(dates), len(values))
+            found.append(symbol)
+            dates_list.append(dates[first:length])
+            values_list.append(values[first:length])
+
+        if not found:
+            return [], np.empty(0, dtype=np.int64), np.empty((0, 0))
+
+        days = np.unique(np.concatenate(dates_list))
+        matrix = np.full((len(found), len(days)), np.nan)
+        for row, (dates, values) in enumerate(zip(dates_list, values_list)):
+            matrix[row, np.searchsorted(days, dates)] = values
+        return found, days, matrix
+
+
+def main(argv=None):
+    from market_data import get_provider
+    from universe import load_universe
+
+    parser = argparse.ArgumentParser(description="Maintain the columnar price history store")
+    sub = parser.add_subparsers(dest='command', required=True)
+    imp = sub.add_parser('import', help="Download history into the store, merging with what is there")
+    imp.add_argument('--years', type=int, default=10)
+    imp.add_argument('--period', default=None, help="yfinance-style period; overrides --years (e.g. 5d to top up)")
+    imp.add_argument('--provider', default=None, help="yfinance, replay or synthetic (default: MARKET_DATA_PROVIDER)")
+    imp.add_argument('--universe', default=None)
+    imp.add_argument('--dir', default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == 'import':
+        symbols = load_universe(args.universe)
+        frames = get_provider(args.provider).download_batch(symbols, period=args.period or f"{args.years}y")
+        bars = HistoryStore(args.dir).write_frames(frames)
+        print(f"Stored {bars} bars for {len(frames)}/{len(symbols)} symbols")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
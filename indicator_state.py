@@ -0,0 +1,210 @@
+import json
+import logging
+from collections import deque
+from datetime import datetime
+
+import db
+
+logger = logging.getLogger(__name__)
+
+
+class IndicatorState:
+    """Rolling SMA, Wilder RSI and EMA for one symbol, updated in O(1) per bar
+
+    update() commits a completed bar. peek() returns the indicator values as
+    if one more bar closed at the given price without changing the state, which
+    is how the still-forming latest bar is analysed every cycle.
+    """
+
+    def __init__(self, rsi_period=14, sma_period=20, ema_period=20):
+        self.rsi_period = rsi_period
+        self.sma_period = sma_period
+        self.ema_period = ema_period
+
+        self.window = deque(maxlen=sma_period)
+        self.window_sum = 0.0
+
+        self.prev_close = None
+        self.deltas_seen = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+        self.bars_seen = 0
+        self.ema_seed_sum = 0.0
+        self.ema = None
+
+        self.last_bar = None
+
+    def _advance(self, close):
+        """Return the scalar state after one more bar without applying it"""
+        deltas_seen = self.deltas_seen
+        avg_gain = self.avg_gain
+        avg_loss = self.avg_loss
+
+        if self.prev_close is not None:
+            delta = close - self.prev_close
+            gain = max(delta, 0.0)
+            loss = max(-delta, 0.0)
+            deltas_seen += 1
+
+            if deltas_seen <= self.rsi_period:
+                avg_gain += gain / self.rsi_period
+                avg_loss += loss / self.rsi_period
+            else:
+                avg_gain = (avg_gain * (self.rsi_period - 1) + gain) / self.rsi_period
+                avg_loss = (avg_loss * (self.rsi_period - 1) + loss) / self.rsi_period
+
+        bars_seen = self.bars_seen + 1
+        ema_seed_sum = self.ema_seed_sum
+        ema = self.ema
+        if bars_seen <= self.ema_period:
+            ema_seed_sum += close
+            if bars_seen == self.ema_period:
+                ema = ema_seed_sum / self.ema_period
+        else:
+            alpha = 2.0 / (self.ema_period + 1)
+            ema = alpha * close + (1 - alpha) * ema
+
+        window_sum = self.window_sum + close
+        if len(self.window) == self.sma_period:
+            window_sum -= self.window[0]
+
+        return deltas_seen, avg_gain, avg_loss, bars_seen, ema_seed_sum, ema, window_sum
+
+    def _values(self, deltas_seen, avg_gain, avg_loss, ema, window_sum, window_len):
+        rsi = None
+        if deltas_seen >= self.rsi_period:
+            rsi = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        return {
+            'rsi': rsi,
+            'sma': window_sum / window_len if window_len else None,
+            'ema': ema
+        }
+
+    def update(self, close, bar=None):
+        """Commit a completed bar and return the new indicator values"""
+        close = float(close)
+        (self.deltas_seen, self.avg_gain, self.avg_loss,
+         self.bars_seen, self.ema_seed_sum, self.ema, self.window_sum) = self._advance(close)
+
+        self.window.append(close)
+        self.prev_close = close
+        if bar is not None:
+            self.last_bar = bar
+
+        return self.values()
+
+    def peek(self, close):
+        """Indicator values if the next bar closed at this price"""
+        close = float(close)
+        deltas_seen, avg_gain, avg_loss, _, _, ema, window_sum = self._advance(close)
+        window_len = min(len(self.window) + 1, self.sma_period)
+        return self._values(deltas_seen, avg_gain, avg_loss, ema, window_sum, window_len)
+
+    def values(self):
+        """Indicator values as of the last committed bar"""
+        return self._values(self.deltas_seen, self.avg_gain, self.avg_loss,
+                            self.ema, self.window_sum, len(self.window))
+
+    def same_periods(self, rsi_period, sma_period, ema_period):
+        return (self.rsi_period, self.sma_period, self.ema_period) == (rsi_period, sma_period, ema_period)
+
+    def to_dict(self):
+        return {
+            'rsi_period': self.rsi_period,
+            'sma_period': self.sma_period,
+            'ema_period': self.ema_period,
+            'window': list(self.window),
+            'window_sum': self.window_sum,
+            'prev_close': self.prev_close,
+            'deltas_seen': self.deltas_seen,
+            'avg_gain': self.avg_gain,
+            'avg_loss': self.avg_loss,
+            'bars_seen': self.bars_seen,
+            'ema_seed_sum': self.ema_seed_sum,
+            'ema': self.ema,
+            'last_bar': self.last_bar
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data['rsi_period'], data['sma_period'], data['ema_period'])
+        state.window.extend(data['window'])
+        state.window_sum = data['window_sum']
+        state.prev_close = data['prev_close']
+        state.deltas_seen = data['deltas_seen']
+        state.avg_gain = data['avg_gain']
+        state.avg_loss = data['avg_loss']
+        state.bars_seen = data['bars_seen']
+        state.ema_seed_sum = data['ema_seed_sum']
+        state.ema = data['ema']
+        state.last_bar = data['last_bar']
+        return state
+
+
+def bar_labels(index):
+    """Bar timestamps as the strings stored in IndicatorState.last_bar"""
+    return [bar.strftime('%Y-%m-%d %H:%M:%S') for bar in index]
+
+
+def advance(state, bars, closes, rsi_period=14, sma_period=20, ema_period=20):
+    """Bring a symbol's state up to date with a frame; returns (state, price, rsi, sma)
+
+    Completed bars are committed to the state once; the newest bar may still
+    be forming, so it is only peeked at. A missing state, a gap in history or
+    changed periods rebuild the state from the frame. Used both in-process
+    and by the indicator pool workers, so both paths give the same values.
+    """
+    if state is None or state.last_bar not in bars or not state.same_periods(rsi_period, sma_period, ema_period):
+        state = IndicatorState(rsi_period=rsi_period, sma_period=sma_period, ema_period=ema_period)
+
+    for bar, close in zip(bars[:-1], closes[:-1]):
+        if state.last_bar is None or bar > state.last_bar:
+            state.update(close, bar)
+
+    values = state.peek(closes[-1])
+    rsi = round(values['rsi'], 2) if values['rsi'] is not None else 50.0
+    return state, float(closes[-1]), rsi, values['sma']
+
+
+class IndicatorStateStore:
+    """Persists IndicatorState objects as JSON in the indicator_state table
+
+    The table is created by db.MIGRATIONS.
+    """
+
+    def load_all(self):
+        """Load every persisted state keyed by symbol"""
+        try:
+            results = db.fetch_all('SELECT symbol, state FROM indicator_state')
+        except Exception as e:
+            logger.error(f"Indicator state load error: {e}")
+            return {}
+
+        states = {}
+        for symbol, raw in results:
+            try:
+                states[symbol] = IndicatorState.from_dict(json.loads(raw))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Discarding unreadable indicator state for {symbol}: {e}")
+        return states
+
+    def save(self, states):
+        """Upsert the given states in a single transaction"""
+        if not states:
+            return
+
+        now = datetime.now()
+        rows = [(symbol, json.dumps(state.to_dict()), db.format_timestamp(now)) for symbol, state in states.items()]
+
+        try:
+            db.execute_many('''
+                INSERT INTO indicator_state (symbol, state, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT (symbol) DO UPDATE SET
+                    state = excluded.state,
+                    updated_at = excluded.updated_at
+            ''', rows)
+        except Exception as e:
+            logger.error(f"Indicator state save error: {e}")
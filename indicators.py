@@ -0,0 +1,146 @@
+"""Vectorized technical indicators over a symbols x bars price matrix.
+
+Every function accepts a 1-D price series or a 2-D matrix with one row per
+symbol. Rows of unequal length are right-aligned and left-padded with NaN by
+align_series, so the newest bar of every symbol is in the last column.
+"""
+import numpy as np
+
+
+def as_matrix(prices):
+    """Return prices as a 2-D float array with one row per symbol"""
+    matrix = np.asarray(prices, dtype=np.float64)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    return matrix
+
+
+def align_series(series_list):
+    """Stack price series of unequal length into a right-aligned NaN-padded matrix"""
+    arrays = [np.asarray(series, dtype=np.float64) for series in series_list]
+    width = max((len(a) for a in arrays), default=0)
+    matrix = np.full((len(arrays), width), np.nan)
+    for row, array in enumerate(arrays):
+        if len(array):
+            matrix[row, width - len(array):] = array
+    return matrix
+
+
+def sma(prices, period=20):
+    """Simple moving average series; NaN until a full window is available"""
+    matrix = as_matrix(prices)
+    valid = ~np.isnan(matrix)
+    values = np.where(valid, matrix, 0.0)
+
+    zeros = np.zeros((matrix.shape[0], 1))
+    sums = np.concatenate([zeros, np.cumsum(values, axis=1)], axis=1)
+    counts = np.concatenate([zeros, np.cumsum(valid, axis=1)], axis=1)
+
+    result = np.full(matrix.shape, np.nan)
+    if matrix.shape[1] >= period:
+        window_sums = sums[:, period:] - sums[:, :-period]
+        window_counts = counts[:, period:] - counts[:, :-period]
+        full = window_counts == period
+        result[:, period - 1:] = np.where(full, window_sums / period, np.nan)
+    return result
+
+
+def sma_latest(prices, period=20):
+    """Latest SMA per row, averaging whatever bars exist when fewer than period"""
+    matrix = as_matrix(prices)
+    window = matrix[:, -period:]
+    counts = np.sum(~np.isnan(window), axis=1)
+    sums = np.nansum(window, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def ema(prices, period=20):
+    """Exponential moving average series seeded with the SMA of the first period bars"""
+    matrix = as_matrix(prices)
+    alpha = 2.0 / (period + 1)
+    rows, width = matrix.shape
+
+    result = np.full(matrix.shape, np.nan)
+    current = np.full(rows, np.nan)
+    seed_sum = np.zeros(rows)
+    seen = np.zeros(rows, dtype=np.int64)
+
+    # The recurrence runs over bars; each step is vectorized across symbols
+    for col in range(width):
+        price = matrix[:, col]
+        valid = ~np.isnan(price)
+        seen += valid
+
+        seeding = valid & (seen <= period)
+        seed_sum[seeding] += price[seeding]
+
+        seeded = valid & (seen == period)
+        current[seeded] = seed_sum[seeded] / period
+
+        smoothing = valid & (seen > period)
+        current[smoothing] = alpha * price[smoothing] + (1 - alpha) * current[smoothing]
+
+        ready = valid & (seen >= period)
+        result[ready, col] = current[ready]
+    return result
+
+
+def rsi(prices, period=14):
+    """Relative Strength Index series using Wilder smoothing
+
+    The first average gain/loss is the simple mean of the first period price
+    changes; later values follow avg = (prev * (period - 1) + current) / period.
+    """
+    matrix = as_matrix(prices)
+    rows, width = matrix.shape
+    result = np.full(matrix.shape, np.nan)
+    if width < 2:
+        return result
+
+    deltas = np.diff(matrix, axis=1)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+
+    avg_gain = np.zeros(rows)
+    avg_loss = np.zeros(rows)
+    seen = np.zeros(rows, dtype=np.int64)
+
+    for col in range(deltas.shape[1]):
+        valid = ~np.isnan(deltas[:, col])
+        seen += valid
+
+        seeding = valid & (seen <= period)
+        avg_gain[seeding] += gains[seeding, col] / period
+        avg_loss[seeding] += losses[seeding, col] / period
+
+        smoothing = valid & (seen > period)
+        avg_gain[smoothing] = (avg_gain[smoothing] * (period - 1) + gains[smoothing, col]) / period
+        avg_loss[smoothing] = (avg_loss[smoothing] * (period - 1) + losses[smoothing, col]) / period
+
+        ready = valid & (seen >= period)
+        result[ready, col + 1] = rsi_from_averages(avg_gain[ready], avg_loss[ready])
+    return result
+
+
+def rsi_from_averages(avg_gain, avg_loss):
+    """Convert average gain/loss into RSI, treating zero average loss as 100"""
+    avg_gain = np.asarray(avg_gain, dtype=np.float64)
+    avg_loss = np.asarray(avg_loss, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        values = 100.0 - 100.0 / (1.0 + rs)
+    return np.where(avg_loss == 0, 100.0, values)
+
+
+def price_vs_sma(prices, period=20):
+    """Percentage distance of each close from its SMA series"""
+    matrix = as_matrix(prices)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (matrix / sma(matrix, period) - 1) * 100
+
+
+def latest(series, default=np.nan):
+    """Newest value of each row, replacing NaN with default"""
+    values = as_matrix(series)[:, -1]
+    return np.where(np.isnan(values), default, values)
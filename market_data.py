@@ -0,0 +1,279 @@
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Yahoo accepts long ticker lists in one request, but very large requests are
+# more likely to be throttled, so the universe is split into chunks.
+FETCH_CHUNK_SIZE = int(os.getenv('FETCH_CHUNK_SIZE', '50'))
+FETCH_CHUNK_PAUSE = float(os.getenv('FETCH_CHUNK_PAUSE', '1'))
+
+
+def chunked(items, size):
+    """Yield successive chunks of a list"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def split_batch_frame(data, symbols):
+    """Split a grouped multi-ticker download into per-symbol frames"""
+    import pandas as pd
+
+    frames = {}
+    if data is None or data.empty:
+        return frames
+
+    if not isinstance(data.columns, pd.MultiIndex):
+        # A single-ticker download comes back with flat OHLCV columns
+        if len(symbols) == 1:
+            frame = data.dropna(how='all')
+            if not frame.empty:
+                frames[symbols[0]] = frame
+        return frames
+
+    available = set(data.columns.get_level_values(0))
+    for symbol in symbols:
+        if symbol not in available:
+            continue
+        frame = data[symbol].dropna(how='all')
+        if not frame.empty:
+            frames[symbol] = frame
+
+    return frames
+
+
+def download_batch(symbols, period="30d", start=None, chunk_size=None, timeout=15, rate_limiter=None):
+    """Download history for many symbols using grouped yfinance requests
+
+    When start is given only bars from that date onwards are requested.
+    yfinance is imported here rather than at module load because it is slow
+    to import and only the analysis path needs it.
+    """
+    import yfinance as yf
+
+    chunk_size = chunk_size or FETCH_CHUNK_SIZE
+    symbols = list(symbols)
+    frames = {}
+
+    for index, chunk in enumerate(chunked(symbols, chunk_size)):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        elif index > 0 and FETCH_CHUNK_PAUSE > 0:
+            time.sleep(FETCH_CHUNK_PAUSE)
+
+        try:
+            data = yf.download(
+                tickers=chunk,
+                period=None if start else period,
+                start=start,
+                group_by='ticker',
+                auto_adjust=True,
+                threads=True,
+                progress=False,
+                timeout=timeout
+            )
+            frames.update(split_batch_frame(data, chunk))
+        except Exception as e:
+            logger.error(f"Batch download error for {len(chunk)} symbols: {e}")
+
+    missing = [s for s in symbols if s not in frames]
+    if missing:
+        logger.warning(f"Batch download returned no data for: {', '.join(missing)}")
+
+    return frames
+
+
+# Which provider the analyzer, backtests and benchmarks use by default
+MARKET_DATA_PROVIDER = os.getenv('MARKET_DATA_PROVIDER', 'yfinance')
+REPLAY_DATA_DIR = os.getenv('REPLAY_DATA_DIR', 'replay_data')
+SYNTHETIC_DAYS = int(os.getenv('SYNTHETIC_DAYS', '2600'))
+
+PERIOD_UNITS = {'d': 1, 'wk': 7, 'mo': 31, 'y': 366}
+
+
+def period_days(period):
+    """Calendar days covered by a yfinance-style period ('30d', '6mo', '10y'); None for 'max'"""
+    for unit, days in PERIOD_UNITS.items():
+        if period and period.endswith(unit) and period[:-len(unit)].isdigit():
+            return int(period[:-len(unit)]) * days
+    return None
+
+
+def trim_frame(data, period=None, start=None):
+    """Keep bars from start onwards, or the trailing period ending at the newest bar"""
+    import pandas as pd
+
+    if data is None or data.empty:
+        return data
+    if start is not None:
+        return data[data.index >= pd.Timestamp(start, tz=data.index.tz)]
+    days = period_days(period)
+    if days is not None:
+        return data[data.index > data.index[-1] - pd.Timedelta(days=days)]
+    return data
+
+
+class MarketDataProvider:
+    """Source of daily OHLCV bars
+
+    Providers return {symbol: DataFrame} with Open/High/Low/Close/Volume
+    columns and a date index. Symbols with no data are left out.
+    """
+
+    name = 'base'
+
+    def download_batch(self, symbols, period="30d", start=None, chunk_size=None, timeout=15, rate_limiter=None):
+        raise NotImplementedError
+
+    def history(self, symbol, period="30d", timeout=15):
+        """Bars for one symbol, or None"""
+        return self.download_batch([symbol], period=period, timeout=timeout).get(symbol)
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Yahoo Finance via yfinance, using grouped multi-ticker downloads"""
+
+    name = 'yfinance'
+
+    def download_batch(self, symbols, period="30d", start=None, chunk_size=None, timeout=15, rate_limiter=None):
+        return download_batch(symbols, period, start, chunk_size, timeout, rate_limiter)
+
+    def history(self, symbol, period="30d", timeout=15):
+        import yfinance as yf
+
+        data = yf.Ticker(symbol).history(period=period, timeout=timeout)
+        return None if data.empty else data
+
+
+class MemoryProvider(MarketDataProvider):
+    """Serves bars from frames held in memory; subclasses fill them on demand"""
+
+    name = 'memory'
+
+    def __init__(self, frames=None):
+        self.frames = dict(frames or {})
+        self.lock = threading.Lock()
+
+    def load(self, symbol):
+        """Frame for a symbol not yet in memory, or None"""
+        return None
+
+    def frame(self, symbol):
+        with self.lock:
+            if symbol not in self.frames:
+                self.frames[symbol] = self.load(symbol)
+            return self.frames[symbol]
+
+    def download_batch(self, symbols, period="30d", start=None, chunk_size=None, timeout=15, rate_limiter=None):
+        frames = {}
+        for symbol in symbols:
+            data = trim_frame(self.frame(symbol), period, start)
+            if data is not None and not data.empty:
+                frames[symbol] = data
+        return frames
+
+
+class ReplayProvider(MemoryProvider):
+    """Replays bars recorded as <symbol>.parquet or <symbol>.csv files in a directory"""
+
+    name = 'replay'
+
+    def __init__(self, directory=None):
+        super().__init__()
+        self.directory = directory or REPLAY_DATA_DIR
+
+    def symbols(self):
+        if not os.path.isdir(self.directory):
+            return []
+        names = (os.path.splitext(name) for name in sorted(os.listdir(self.directory)))
+        return [stem for stem, ext in names if ext in ('.csv', '.parquet')]
+
+    def load(self, symbol):
+        import pandas as pd
+
+        path = os.path.join(self.directory, symbol)
+        if os.path.exists(path + '.parquet'):
+            data = pd.read_parquet(path + '.parquet')
+        elif os.path.exists(path + '.csv'):
+            data = pd.read_csv(path + '.csv', index_col=0)
+        else:
+            return None
+        data.index = pd.to_datetime(data.index, utc=True).tz_convert('Asia/Kolkata')
+        return data.sort_index()
+
+    def record(self, frames, fmt='csv'):
+        """Write frames so they can be replayed later"""
+        os.makedirs(self.directory, exist_ok=True)
+        for symbol, data in frames.items():
+            path = os.path.join(self.directory, f"{symbol}.{fmt}")
+            if fmt == 'parquet':
+                data.to_parquet(path)
+            else:
+                data.to_csv(path, index_label='Date')
+
+
+class SyntheticProvider(MemoryProvider):
+    """Deterministic random-walk bars generated per symbol, ending today"""
+
+    name = 'synthetic'
+
+    def __init__(self, days=SYNTHETIC_DAYS, seed=0):
+        super().__init__()
+        self.days = days
+        self.seed = seed
+
+    def load(self, symbol):
+        import zlib
+        import numpy as np
+        import pandas as pd
+
+        rng = np.random.default_rng(self.seed + zlib.crc32(symbol.encode('utf-8')))
+        index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=self.days, tz='Asia/Kolkata')
+        close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.018, self.days))
+        return pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.004, self.days)),
+            'High': close * 1.01,
+            'Low': close * 0.99,
+            'Close': close,
+            'Volume': rng.integers(100000, 5000000, self.days)
+        }, index=index)
+
+
+class HistoryStoreProvider(MarketDataProvider):
+    """Reads bars from the memory-mapped columnar history store (history_store.py)"""
+
+    name = 'store'
+
+    def __init__(self, directory=None):
+        from history_store import HistoryStore
+
+        self.store = HistoryStore(directory)
+
+    def download_batch(self, symbols, period="30d", start=None, chunk_size=None, timeout=15, rate_limiter=None):
+        import numpy as np
+
+        start_day = np.datetime64(str(start)[:10], 'D').astype(np.int64) if start is not None else None
+        frames = {}
+        for symbol in symbols:
+            data = trim_frame(self.store.frame(symbol, start_day=start_day), period, None)
+            if data is not None and not data.empty:
+                frames[symbol] = data
+        return frames
+
+
+PROVIDERS = {
+    'yfinance': YFinanceProvider,
+    'replay': ReplayProvider,
+    'synthetic': SyntheticProvider,
+    'store': HistoryStoreProvider
+}
+
+
+def get_provider(name=None):
+    """Create the provider named by MARKET_DATA_PROVIDER (yfinance, replay, synthetic or store)"""
+    name = (name or MARKET_DATA_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown market data provider '{name}'; choose from {', '.join(PROVIDERS)}")
+    return PROVIDERS[name]()
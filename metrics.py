@@ -0,0 +1,235 @@
+import os
+import time
+import threading
+import logging
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# Instrumentation is on by default; METRICS_ENABLED=0 turns every call into a no-op
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_disabled_timer = nullcontext()
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values, extra=None):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    """Base for labelled metrics kept in memory and rendered in Prometheus text format"""
+
+    kind = 'untyped'
+
+    def __init__(self, registry, name, description, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            items = list(self.values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def total(self):
+        with self.lock:
+            return sum(self.values.values())
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        with self.lock:
+            self.values[self.key(labels)] = value
+
+
+class Histogram(Metric):
+    """Bucketed observations plus count, sum and max per label set"""
+
+    kind = 'histogram'
+
+    def __init__(self, registry, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = self.key(labels)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = {'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0, 'max': 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['buckets'][i] += 1
+                    break
+            entry['count'] += 1
+            entry['sum'] += value
+            entry['max'] = max(entry['max'], value)
+
+    def time(self, **labels):
+        """Context manager observing the duration of its block"""
+        if not self.registry.enabled:
+            return _disabled_timer
+        return self._timer(labels)
+
+    @contextmanager
+    def _timer(self, labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def summary(self):
+        """{label value(s): count/avg/max} for /health"""
+        with self.lock:
+            items = [(key, dict(entry)) for key, entry in self.values.items()]
+        result = {}
+        for key, entry in items:
+            name = ','.join(key) or 'all'
+            result[name] = {
+                'count': entry['count'],
+                'avg_seconds': round(entry['sum'] / entry['count'], 4) if entry['count'] else None,
+                'max_seconds': round(entry['max'], 4)
+            }
+        return result
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            items = [(key, dict(entry, buckets=list(entry['buckets']))) for key, entry in self.values.items()]
+        for key, entry in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry['buckets']):
+                cumulative += count
+                labels = format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {entry['count']}")
+            labels = format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {entry['sum']}")
+            lines.append(f"{self.name}_count{labels} {entry['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self.metrics = []
+
+    def counter(self, name, description, labelnames=()):
+        return self._register(Counter(self, name, description, labelnames))
+
+    def gauge(self, name, description, labelnames=()):
+        return self._register(Gauge(self, name, description, labelnames))
+
+    def histogram(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, description, labelnames, buckets))
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """Compact view of stage timings and counters for /health"""
+        if not self.enabled:
+            return {'enabled': False}
+        return {
+            'enabled': True,
+            'stages': STAGE_SECONDS.summary(),
+            'fetch_failures': FETCH_FAILURES.total(),
+            'empty_frames': EMPTY_FRAMES.total(),
+            'signals_generated': SIGNALS_GENERATED.total(),
+            'signal_transitions': SIGNAL_TRANSITIONS.total(),
+            'telegram_send_errors': TELEGRAM_SEND_ERRORS.total()
+        }
+
+
+def serve(port, host='0.0.0.0'):
+    """Serve /metrics from a process without the Flask app, such as worker.py"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    logger.info(f"Serving metrics on port {port}")
+    return server
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    'nifty_stage_seconds', 'Duration of analysis cycle stages', ['stage'])
+SYMBOL_SECONDS = registry.gauge(
+    'nifty_symbol_seconds', 'Latest per-symbol duration of a stage', ['stage', 'symbol'])
+FETCH_FAILURES = registry.counter(
+    'nifty_fetch_failures_total', 'Symbols whose market data could not be fetched')
+EMPTY_FRAMES = registry.counter(
+    'nifty_empty_frames_total', 'Fetches that returned no or too few bars')
+SIGNALS_GENERATED = registry.counter(
+    'nifty_signals_generated_total', 'Signals produced by analysis cycles', ['signal_type', 'strength'])
+SIGNAL_TRANSITIONS = registry.counter(
+    'nifty_signal_transitions_total', 'Signals that started, strengthened or cleared', ['transition'])
+TELEGRAM_SEND_SECONDS = registry.histogram(
+    'nifty_telegram_send_seconds', 'Duration of Telegram sendMessage calls')
+TELEGRAM_MESSAGES_SENT = registry.counter(
+    'nifty_telegram_messages_sent_total', 'Telegram messages delivered')
+TELEGRAM_SEND_ERRORS = registry.counter(
+    'nifty_telegram_send_errors_total', 'Failed Telegram send attempts', ['reason'])
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'nifty_http_request_seconds', 'Time to build HTTP responses', ['endpoint'])
@@ -0,0 +1,105 @@
+import os
+import math
+import atexit
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, get_context, get_all_start_methods
+
+import numpy as np
+
+import indicators
+import signal_rules
+from indicator_state import IndicatorState, advance
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for indicator and rule evaluation; 0 keeps it in-process
+INDICATOR_PROCESSES = int(os.getenv('INDICATOR_PROCESSES', '0'))
+
+START_METHOD = 'forkserver' if 'forkserver' in get_all_start_methods() else 'spawn'
+
+
+def compute_chunk(shm_name, shape, start, stop, symbols, bars_list, state_dicts):
+    """Worker: advance indicator state and evaluate rows start:stop of the shared price matrix
+
+    Prices are read in place from shared memory; only bar labels and the
+    small per-symbol state are pickled, and the advanced state is returned.
+    """
+    block = shared_memory.SharedMemory(name=shm_name)
+    try:
+        matrix = np.ndarray(shape, dtype=np.float64, buffer=block.buf)[start:stop]
+
+        results = []
+        for row, (symbol, bars, state_dict) in enumerate(zip(symbols, bars_list, state_dicts)):
+            # Rows are right-aligned, so a symbol's bars are the last len(bars) columns
+            closes = np.array(matrix[row, shape[1] - len(bars):])
+            state = IndicatorState.from_dict(state_dict) if state_dict is not None else None
+            state, price, rsi, sma_20 = advance(state, bars, closes)
+            results.append((symbol, price, rsi, sma_20,
+                            signal_rules.evaluate(symbol, price, rsi, sma_20), state.to_dict()))
+        del matrix
+        return results
+    finally:
+        block.close()
+
+
+class IndicatorPool:
+    """Spreads indicator calculation for many symbols across CPU cores
+
+    Close prices are packed into one right-aligned matrix in shared memory and
+    each worker process advances the rolling indicator state for a contiguous
+    block of rows.
+    """
+
+    def __init__(self, processes=INDICATOR_PROCESSES):
+        self.processes = processes
+        self.executor = None
+
+    def get_executor(self):
+        if self.executor is None:
+            # Forking would copy the analyzer's Telegram, metrics and database
+            # threads and locks into the workers; forkserver starts them clean
+            self.executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=get_context(START_METHOD))
+            atexit.register(self.shutdown)
+        return self.executor
+
+    def evaluate(self, closes_by_symbol, bars_by_symbol, states):
+        """Return {symbol: (price, rsi, sma_20, signals, state)} for every symbol given
+
+        states maps symbols to their IndicatorState (or None for a cold
+        start); the returned states have the frame's completed bars applied.
+        """
+        symbols = list(closes_by_symbol)
+        if not symbols:
+            return {}
+
+        matrix = indicators.align_series([closes_by_symbol[s] for s in symbols])
+        block = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+        try:
+            shared = np.ndarray(matrix.shape, dtype=np.float64, buffer=block.buf)
+            shared[:] = matrix
+            del shared
+
+            rows_per_task = math.ceil(len(symbols) / self.processes)
+            futures = []
+            for start in range(0, len(symbols), rows_per_task):
+                chunk = symbols[start:start + rows_per_task]
+                chunk_states = [states[s].to_dict() if states.get(s) is not None else None for s in chunk]
+                futures.append(self.get_executor().submit(
+                    compute_chunk, block.name, matrix.shape, start, start + rows_per_task,
+                    chunk, [bars_by_symbol[s] for s in chunk], chunk_states
+                ))
+
+            results = {}
+            for future in futures:
+                for symbol, price, rsi, sma_20, signals, state in future.result():
+                    results[symbol] = (price, rsi, sma_20, signals, IndicatorState.from_dict(state))
+            return results
+        finally:
+            block.close()
+            block.unlink()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,107 @@
+import os
+import math
+import logging
+from datetime import datetime, date, time, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+# India does not observe daylight saving, so a fixed offset is exact
+IST = timezone(timedelta(hours=5, minutes=30), 'IST')
+
+SESSION_OPEN = time(9, 15)
+SESSION_CLOSE = time(15, 30)
+
+HOLIDAYS_FILE = os.getenv('NSE_HOLIDAYS_FILE', 'nse_holidays.txt')
+
+
+def load_holidays(path=HOLIDAYS_FILE, extra=None):
+    """Read NSE trading holidays from a file of ISO dates plus a comma-separated list"""
+    holidays = set()
+
+    if path and os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    holidays.add(date.fromisoformat(line))
+
+    extra = extra if extra is not None else os.getenv('NSE_HOLIDAYS', '')
+    for item in extra.split(','):
+        if item.strip():
+            holidays.add(date.fromisoformat(item.strip()))
+
+    return holidays
+
+
+def now_ist():
+    return datetime.now(IST)
+
+
+class MarketCalendar:
+    """NSE cash-market sessions: 9:15-15:30 IST on weekdays that are not holidays"""
+
+    def __init__(self, holidays=None):
+        self.holidays = set(holidays) if holidays is not None else load_holidays()
+
+    def is_trading_day(self, day):
+        return day.weekday() < 5 and day not in self.holidays
+
+    def session(self, day):
+        """Open and close datetimes of a day's session in IST"""
+        return (datetime.combine(day, SESSION_OPEN, IST),
+                datetime.combine(day, SESSION_CLOSE, IST))
+
+    def is_open(self, now=None):
+        now = (now or now_ist()).astimezone(IST)
+        if not self.is_trading_day(now.date()):
+            return False
+        open_at, close_at = self.session(now.date())
+        return open_at <= now < close_at
+
+    def next_trading_day(self, day):
+        day += timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return day
+
+
+class AdaptiveScheduler:
+    """Plans analysis runs on bar-close boundaries during the NSE session
+
+    During the session runs happen every interval, shortly after each bar
+    closes (open + k * interval + settle). One last run follows the close, and
+    nothing runs again until the next trading session.
+    """
+
+    def __init__(self, calendar=None, interval_minutes=5, settle_seconds=30):
+        self.calendar = calendar or MarketCalendar()
+        self.interval = timedelta(minutes=interval_minutes)
+        self.settle = timedelta(seconds=settle_seconds)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            interval_minutes=float(os.getenv('MARKET_INTERVAL_MINUTES', '5')),
+            settle_seconds=float(os.getenv('BAR_SETTLE_SECONDS', '30'))
+        )
+
+    def first_run(self, day):
+        open_at, _ = self.calendar.session(day)
+        return open_at + self.interval + self.settle
+
+    def next_run(self, now=None):
+        """Datetime (IST) of the next run strictly after now"""
+        now = (now or now_ist()).astimezone(IST)
+        today = now.date()
+
+        if self.calendar.is_trading_day(today):
+            open_at, close_at = self.calendar.session(today)
+            last_run = close_at + self.settle
+
+            if now < self.first_run(today):
+                return self.first_run(today)
+            if now < last_run:
+                bars = math.floor((now - open_at - self.settle) / self.interval) + 1
+                return min(open_at + self.settle + bars * self.interval, last_run)
+
+        return self.first_run(self.calendar.next_trading_day(today))
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+# Plain module-level functions so worker processes can import and call them
+
+RSI_OVERSOLD = 30
+RSI_OVERBOUGHT = 70
+SMA_DISTANCE_PCT = 2
+SMA_BUY_MAX_RSI = 60
+SMA_SELL_MIN_RSI = 40
+
+# (name, signal_type, strength) for every rule, in evaluation order
+RULES = [
+    ('rsi_oversold', 'BUY', 'STRONG'),
+    ('rsi_overbought', 'SELL', 'STRONG'),
+    ('above_sma', 'BUY', 'MEDIUM'),
+    ('below_sma', 'SELL', 'MEDIUM')
+]
+
+
+# Ordering used to tell whether a signal strengthened between cycles
+STRENGTH_RANK = {'WEAK': 0, 'MEDIUM': 1, 'STRONG': 2}
+
+
+def make_signal(symbol, rule, signal_type, strength, price, description, timestamp):
+    return {
+        'symbol': symbol,
+        'rule': rule,
+        'signal_type': signal_type,
+        'strength': strength,
+        'price': round(price, 2),
+        'description': description,
+        'timestamp': timestamp
+    }
+
+
+def evaluate(symbol, current_price, rsi, sma_20, timestamp=None):
+    """Apply the RSI and price-vs-SMA20 rules to one symbol; returns a list or None"""
+    timestamp = timestamp or datetime.now()
+    signals = []
+
+    if rsi < RSI_OVERSOLD:
+        signals.append(make_signal(symbol, 'rsi_oversold', 'BUY', 'STRONG', current_price,
+                                   f'RSI Oversold: {rsi}', timestamp))
+    elif rsi > RSI_OVERBOUGHT:
+        signals.append(make_signal(symbol, 'rsi_overbought', 'SELL', 'STRONG', current_price,
+                                   f'RSI Overbought: {rsi}', timestamp))
+
+    price_vs_sma = (current_price / sma_20 - 1) * 100
+    if price_vs_sma > SMA_DISTANCE_PCT and rsi < SMA_BUY_MAX_RSI:
+        signals.append(make_signal(symbol, 'above_sma', 'BUY', 'MEDIUM', current_price,
+                                   f'Price {price_vs_sma:.1f}% above SMA20', timestamp))
+    elif price_vs_sma < -SMA_DISTANCE_PCT and rsi > SMA_SELL_MIN_RSI:
+        signals.append(make_signal(symbol, 'below_sma', 'SELL', 'MEDIUM', current_price,
+                                   f'Price {abs(price_vs_sma):.1f}% below SMA20', timestamp))
+
+    return signals if signals else None
+
+
+def evaluate_matrix(rsi, price_vs_sma, oversold=RSI_OVERSOLD, overbought=RSI_OVERBOUGHT,
+                    sma_distance=SMA_DISTANCE_PCT, buy_max_rsi=SMA_BUY_MAX_RSI, sell_min_rsi=SMA_SELL_MIN_RSI):
+    """Vectorized evaluate() over whole indicator arrays, with overridable thresholds
+
+    Returns {rule name: boolean mask}; NaN inputs never fire a rule.
+    """
+    return {
+        'rsi_oversold': rsi < oversold,
+        'rsi_overbought': rsi > overbought,
+        'above_sma': (price_vs_sma > sma_distance) & (rsi < buy_max_rsi),
+        'below_sma': (price_vs_sma < -sma_distance) & (rsi > sell_min_rsi)
+    }
@@ -0,0 +1,142 @@
+import logging
+import threading
+from datetime import datetime
+
+import db
+from signal_rules import STRENGTH_RANK
+
+logger = logging.getLogger(__name__)
+
+
+def strongest(signals):
+    """The strongest signal per signal_type; the first rule wins a tie"""
+    best = {}
+    for signal in signals or []:
+        current = best.get(signal['signal_type'])
+        if current is None or STRENGTH_RANK.get(signal['strength'], 0) > STRENGTH_RANK.get(current['strength'], 0):
+            best[signal['signal_type']] = signal
+    return best
+
+
+class SignalStateStore:
+    """Active signal per (symbol, signal_type) in the signal_state table
+
+    Each cycle's signals are diffed against the stored state so only
+    transitions are persisted and alerted: a direction starting to fire
+    ('new'), its strongest rule moving up a strength, e.g. above_sma MEDIUM
+    to rsi_oversold STRONG ('strengthened'), or no BUY/SELL rule firing any
+    more ('cleared'). A condition that simply holds produces nothing.
+    The table itself is created by db.MIGRATIONS.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.states = self.load_all()
+
+    def load_all(self):
+        """Active signals keyed by symbol, then signal_type"""
+        try:
+            results = db.fetch_all('''
+                SELECT symbol, signal_type, rule, strength, price, description, since
+                FROM signal_state
+            ''')
+        except Exception as e:
+            logger.error(f"Signal state load error: {e}")
+            return {}
+
+        states = {}
+        for symbol, signal_type, rule, strength, price, description, since in results:
+            states.setdefault(symbol, {})[signal_type] = {
+                'symbol': symbol,
+                'signal_type': signal_type,
+                'rule': rule,
+                'strength': strength,
+                'price': price,
+                'description': description,
+                'since': since,
+                'timestamp': since
+            }
+        return states
+
+    def apply(self, signals_by_symbol):
+        """Diff this cycle's signals against the stored state and save the result
+
+        signals_by_symbol must hold every symbol analyzed this cycle (None or
+        an empty list when nothing fired); symbols left out keep their state.
+        Returns (changed, cleared): changed signals carry a 'transition' of
+        'new' or 'strengthened'; cleared entries are the stored signals that
+        stopped firing.
+        """
+        now = datetime.now()
+        changed = []
+        cleared = []
+        upserts = []
+        deletes = []
+
+        with self.lock:
+            for symbol, signals in signals_by_symbol.items():
+                previous = self.states.get(symbol, {})
+                current = {}
+
+                for signal_type, signal in strongest(signals).items():
+                    before = previous.get(signal_type)
+                    if before is None:
+                        transition = 'new'
+                    elif STRENGTH_RANK.get(signal['strength'], 0) > STRENGTH_RANK.get(before['strength'], 0):
+                        transition = 'strengthened'
+                    else:
+                        transition = None
+
+                    since = before['since'] if before is not None else db.format_timestamp(now)
+                    current[signal_type] = {
+                        'symbol': symbol,
+                        'signal_type': signal_type,
+                        'rule': signal['rule'],
+                        'strength': signal['strength'],
+                        'price': signal['price'],
+                        'description': signal['description'],
+                        'since': since,
+                        'timestamp': since
+                    }
+                    if transition is not None:
+                        changed.append(dict(signal, transition=transition))
+                    if before is None or before['rule'] != signal['rule']:
+                        upserts.append(current[signal_type])
+                    else:
+                        # A holding rule keeps its stored row; only the in-memory price moves
+                        current[signal_type]['price'] = before['price']
+                        current[signal_type]['description'] = before['description']
+
+                for signal_type, before in previous.items():
+                    if signal_type not in current:
+                        cleared.append(before)
+                        deletes.append((symbol, signal_type))
+
+                if current:
+                    self.states[symbol] = current
+                else:
+                    self.states.pop(symbol, None)
+
+            self.save(upserts, deletes, now)
+
+        return changed, cleared
+
+    def save(self, upserts, deletes, now):
+        if not upserts and not deletes:
+            return
+        try:
+            with db.transaction() as cursor:
+                cursor.executemany('''
+                    INSERT INTO signal_state (symbol, signal_type, rule, strength, price, description, since, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (symbol, signal_type) DO UPDATE SET
+                        rule = excluded.rule,
+                        strength = excluded.strength,
+                        price = excluded.price,
+                        description = excluded.description,
+                        updated_at = excluded.updated_at
+                ''', [(e['symbol'], e['signal_type'], e['rule'], e['strength'], e['price'],
+                       e['description'], e['since'], db.format_timestamp(now)) for e in upserts])
+                cursor.executemany('DELETE FROM signal_state WHERE symbol = ? AND signal_type = ?', deletes)
+        except Exception as e:
+            logger.error(f"Signal state save error: {e}")
@@ -0,0 +1,71 @@
+import json
+import hashlib
+import threading
+import logging
+from collections import namedtuple
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# body is the pre-encoded JSON served by /api/latest-signals and event is the
+# same payload framed once as a Server-Sent Event for every stream client
+SignalSnapshot = namedtuple('SignalSnapshot', ['body', 'event', 'etag', 'version', 'day', 'generated_at'])
+
+
+def build_snapshot(signals, version):
+    """Encode signals once into an immutable snapshot with a content ETag"""
+    formatted = [{
+        'symbol': signal['symbol'].replace('.NS', ''),
+        'signal_type': signal['signal_type'],
+        'strength': signal['strength'],
+        'price': signal['price'],
+        'timestamp': str(signal['timestamp']),
+        'description': signal['description']
+    } for signal in signals]
+
+    body = json.dumps(formatted, separators=(',', ':')).encode('utf-8')
+    event = b'id: %d\nevent: signals\ndata: %s\n\n' % (version, body)
+    etag = hashlib.sha1(body).hexdigest()[:20]
+    now = datetime.now()
+    return SignalSnapshot(body, event, etag, version, now.date(), now)
+
+
+class SnapshotStore:
+    """Holds the latest signals snapshot; readers never see a partial update
+
+    Stream clients block on a shared condition rather than polling, so one
+    publish wakes every subscriber and each receives the same encoded event.
+    """
+
+    def __init__(self):
+        self.current = None
+        self.version = 0
+        self.changed = threading.Condition()
+
+    def publish(self, signals):
+        """Build a new snapshot, swap it in and wake stream subscribers"""
+        with self.changed:
+            self.version += 1
+            snapshot = build_snapshot(signals, self.version)
+            self.current = snapshot
+            self.changed.notify_all()
+        logger.info(f"Published signals snapshot v{snapshot.version} ({len(signals)} signals)")
+        return snapshot
+
+    def get(self):
+        """Current snapshot, or None when it is missing or from a previous day"""
+        snapshot = self.current
+        if snapshot is None or snapshot.day != datetime.now().date():
+            return None
+        return snapshot
+
+    def wait_for_update(self, version, timeout):
+        """Block until a snapshot newer than version exists, or return None on timeout"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version > version, timeout=timeout)
+            if self.version > version:
+                return self.current
+        return None
+
+
+snapshot_store = SnapshotStore()
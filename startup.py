@@ -0,0 +1,52 @@
+import time
+import threading
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Records import durations and milestone times since process start
+
+    The clock starts when this module is first imported, so entry points
+    import it before anything else.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports = {}
+        self.milestones = {}
+        self.lock = threading.Lock()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @contextmanager
+    def timed(self, name):
+        """Time the block, typically one or more imports, under name"""
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.imports[name] = round(time.perf_counter() - began, 4)
+
+    def mark(self, name):
+        """Record the first time a milestone is reached; returns True that first time"""
+        with self.lock:
+            if name in self.milestones:
+                return False
+            self.milestones[name] = round(self.elapsed(), 4)
+        logger.info(f"Startup: {name} after {self.milestones[name]:.3f}s")
+        return True
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                'import_seconds': dict(self.imports),
+                'milestone_seconds': dict(self.milestones)
+            }
+
+
+startup_report = StartupReport()
@@ -0,0 +1,82 @@
+import os
+import time
+import threading
+import logging
+
+import db
+
+logger = logging.getLogger(__name__)
+
+STATS_CACHE_TTL = float(os.getenv('STATS_CACHE_TTL', '60'))
+
+
+def compute_signal_stats(since):
+    """Count signals since a timestamp with one grouped query"""
+    rows = db.fetch_all('''
+        SELECT symbol, signal_type, strength, COUNT(*)
+        FROM analysis_results
+        WHERE timestamp >= ?
+        GROUP BY symbol, signal_type, strength
+    ''', (since,))
+
+    totals = {'BUY': 0, 'SELL': 0}
+    by_symbol = {}
+    by_strength = {}
+
+    for symbol, signal_type, strength, count in rows:
+        totals[signal_type] = totals.get(signal_type, 0) + count
+
+        symbol_counts = by_symbol.setdefault(symbol.replace('.NS', ''), {'BUY': 0, 'SELL': 0})
+        symbol_counts[signal_type] = symbol_counts.get(signal_type, 0) + count
+
+        strength_counts = by_strength.setdefault(strength, {'BUY': 0, 'SELL': 0})
+        strength_counts[signal_type] = strength_counts.get(signal_type, 0) + count
+
+    return {
+        'today_total': sum(totals.values()),
+        'today_buy': totals['BUY'],
+        'today_sell': totals['SELL'],
+        'by_symbol': by_symbol,
+        'by_strength': by_strength
+    }
+
+
+class StatsCache:
+    """Caches today's stats until the next analysis cycle saves signals
+
+    The TTL bounds staleness when another process writes the database.
+    """
+
+    def __init__(self, ttl=STATS_CACHE_TTL):
+        self.ttl = ttl
+        self.generation = 0
+        self.entry = None
+        self.lock = threading.Lock()
+
+    def invalidate(self):
+        """Drop the cached stats; called after a cycle commits new signals"""
+        with self.lock:
+            self.generation += 1
+            self.entry = None
+
+    def get(self):
+        """Return today's stats, recomputing only when the cache is stale"""
+        since = db.day_start()
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entry
+            generation = self.generation
+        if entry and entry['since'] == since and entry['expires'] > now:
+            return entry['stats']
+
+        stats = compute_signal_stats(since)
+
+        with self.lock:
+            # A save during the query means these counts may already be stale
+            if generation == self.generation:
+                self.entry = {'since': since, 'expires': now + self.ttl, 'stats': stats}
+        return stats
+
+
+stats_cache = StatsCache()
@@ -0,0 +1,182 @@
+"""Grid search over the signal rule parameters using the backtest core.
+
+RSI is computed once per distinct RSI period and price-vs-SMA once per
+distinct SMA period; every threshold combination then only re-thresholds
+those shared arrays. Combinations are scored in a process pool and written
+to a CSV ranked by directional edge.
+
+    python sweep.py --years 10 --horizon 10 --output sweep.csv
+"""
+import os
+import sys
+import csv
+import time
+import argparse
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import indicators
+import signal_rules
+from backtest import load_close_matrix, forward_returns
+
+logger = logging.getLogger(__name__)
+
+# Parameter name -> default values swept
+DEFAULT_GRID = {
+    'rsi_period': [7, 14, 21],
+    'sma_period': [10, 20, 50],
+    'oversold': [20, 25, 30, 35],
+    'overbought': [65, 70, 75, 80],
+    'sma_distance': [1, 2, 3],
+    'buy_max_rsi': [50, 60, 70],
+    'sell_min_rsi': [30, 40, 50]
+}
+
+THRESHOLDS = ['oversold', 'overbought', 'sma_distance', 'buy_max_rsi', 'sell_min_rsi']
+
+# Indicator arrays shared by every combination a worker scores
+_shared = {}
+
+
+def precompute(matrix, grid, horizon):
+    """Indicator arrays for each distinct period plus the forward returns"""
+    forward = forward_returns(matrix, horizon)
+    with np.errstate(invalid='ignore'):
+        return {
+            'rsi': {period: np.round(indicators.rsi(matrix, period), 2) for period in grid['rsi_period']},
+            'price_vs_sma': {period: indicators.price_vs_sma(matrix, period) for period in grid['sma_period']},
+            'forward': np.where(np.isnan(forward), 0.0, forward),
+            'has_forward': ~np.isnan(forward)
+        }
+
+
+def init_worker(arrays):
+    _shared.update(arrays)
+
+
+def score_combo(params, arrays=None):
+    """Score one parameter combination against the shared arrays"""
+    arrays = arrays or _shared
+    rsi = arrays['rsi'][params['rsi_period']]
+    price_vs_sma = arrays['price_vs_sma'][params['sma_period']]
+    with np.errstate(invalid='ignore'):
+        masks = signal_rules.evaluate_matrix(rsi, price_vs_sma, **{k: params[k] for k in THRESHOLDS})
+
+    row = dict(params)
+    total_count = 0
+    total_edge = 0.0
+    total_hits = 0
+    for name, signal_type, _ in signal_rules.RULES:
+        mask = masks[name] & arrays['has_forward']
+        direction = 1.0 if signal_type == 'BUY' else -1.0
+        count = int(mask.sum())
+        directional = arrays['forward'][mask] * direction
+        hits = int((directional > 0).sum())
+        edge = float(directional.sum())
+
+        row[f'{name}_count'] = count
+        row[f'{name}_hit_rate'] = round(hits / count, 4) if count else None
+        row[f'{name}_edge'] = round(edge / count, 6) if count else None
+        total_count += count
+        total_edge += edge
+        total_hits += hits
+
+    row['signals'] = total_count
+    row['hit_rate'] = round(total_hits / total_count, 4) if total_count else None
+    row['edge'] = round(total_edge / total_count, 6) if total_count else None
+    return row
+
+
+def score_batch(batch):
+    return [score_combo(params) for params in batch]
+
+
+def combinations(grid):
+    names = list(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        # Overlapping RSI bands would fire BUY and SELL together
+        if params['oversold'] >= params['overbought']:
+            continue
+        yield params
+
+
+def run_sweep(matrix, grid=None, horizon=10, processes=None, min_signals=30, batch_size=200):
+    """Score every combination in grid over a symbols x days close matrix; returns rows ranked best first"""
+    grid = grid or DEFAULT_GRID
+    arrays = precompute(matrix, grid, horizon)
+    combos = list(combinations(grid))
+    batches = [combos[i:i + batch_size] for i in range(0, len(combos), batch_size)]
+
+    processes = processes if processes is not None else os.cpu_count() or 1
+    if processes <= 1:
+        rows = [score_combo(params, arrays) for params in combos]
+    else:
+        # Workers receive the precomputed arrays once, not once per combination
+        with ProcessPoolExecutor(max_workers=processes, initializer=init_worker, initargs=(arrays,)) as executor:
+            rows = [row for batch in executor.map(score_batch, batches) for row in batch]
+
+    ranked = [row for row in rows if row['signals'] >= min_signals]
+    # Combinations without scored signals (edge None) rank last
+    ranked.sort(key=lambda row: (row['edge'] is not None, row['edge'] or 0, row['hit_rate'] or 0), reverse=True)
+    for rank, row in enumerate(ranked, 1):
+        row['rank'] = rank
+    return ranked
+
+
+def write_csv(rows, path):
+    if not rows:
+        return
+    fields = ['rank'] + [key for key in rows[0] if key != 'rank']
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_values(text):
+    return [float(v) if '.' in v else int(v) for v in text.split(',')]
+
+
+def main(argv=None):
+    from universe import load_universe
+
+    parser = argparse.ArgumentParser(description="Grid search over signal rule parameters")
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--horizon', type=int, default=10, help="Forward return horizon in trading days")
+    parser.add_argument('--universe', default=None, help="Universe list name (default: UNIVERSE)")
+    parser.add_argument('--provider', default=None, help="yfinance, replay, synthetic or store (default: MARKET_DATA_PROVIDER)")
+    parser.add_argument('--processes', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--min-signals', type=int, default=30, help="Drop combinations with fewer signals")
+    parser.add_argument('--output', default='sweep_results.csv')
+    for name, values in DEFAULT_GRID.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", default=','.join(map(str, values)),
+                            help=f"Comma-separated values (default: {','.join(map(str, values))})")
+    args = parser.parse_args(argv)
+
+    grid = {name: parse_values(getattr(args, name)) for name in DEFAULT_GRID}
+    found, _, matrix = load_close_matrix(load_universe(args.universe), args.years, args.provider)
+    if not found:
+        logger.error("No history loaded")
+        return 1
+
+    started = time.perf_counter()
+    rows = run_sweep(matrix, grid, args.horizon, args.processes, args.min_signals)
+    elapsed = time.perf_counter() - started
+
+    write_csv(rows, args.output)
+    print(f"Ranked {len(rows)} combinations in {elapsed:.1f}s; results in {args.output}")
+    for row in rows[:10]:
+        params = ', '.join(f"{name}={row[name]}" for name in DEFAULT_GRID)
+        edge = f"{row['edge']:+.3%}" if row['edge'] is not None else '-'
+        hit_rate = f"{row['hit_rate']:.1%}" if row['hit_rate'] is not None else '-'
+        print(f"  #{row['rank']}: edge {edge} hit {hit_rate} signals {row['signals']}  ({params})")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -2,7 +2,7 @@ import os
 import asyncio
 from telegram import Bot, Update
 from telegram.ext import Application, CommandHandler, ContextTypes
-import sqlite3
+import db
 from datetime import datetime, timedelta
 import logging
 
@@ -76,31 +76,35 @@ This bot provides real-time technical analysis and trading signals for Nifty 50
         await update.message.reply_text(help_message, parse_mode='HTML')
     
     def get_signals_from_db(self, signal_type=None, limit=10):
-        """Get signals from database"""
-        conn = sqlite3.connect('nifty_analysis.db')
-        cursor = conn.cursor()
-        
+        """Get currently active signals from database"""
         query = '''
-            SELECT symbol, signal_type, strength, price, timestamp, description
-            FROM analysis_results
-            WHERE DATE(timestamp) = DATE('now')
+            SELECT symbol, signal_type, strength, price, since, description
+            FROM signal_state
         '''
+        params = []
         
         if signal_type:
-            query += f" AND signal_type = '{signal_type}'"
-        
-        query += " ORDER BY timestamp DESC LIMIT ?"
+            query += " WHERE signal_type = ?"
+            params.append(signal_type)
         
-        cursor.execute(query, (limit,))
-        results = cursor.fetchall()
-        conn.close()
+        query += " ORDER BY since DESC LIMIT ?"
+        params.append(limit)
         
-        return results
+        return db.fetch_all(query, params)
+    
+    def get_today_signals_from_db(self, limit=50):
+        """Get the signals that started or strengthened today from database"""
+        return db.fetch_all('''
+            SELECT symbol, signal_type, strength, price, timestamp, description
+            FROM analysis_results
+            WHERE timestamp >= ?
+            ORDER BY timestamp DESC LIMIT ?
+        ''', (db.day_start(), limit))
     
     def format_signals_for_telegram(self, signals, title="Latest Signals"):
         """Format signals for Telegram message"""
         if not signals:
-            return f"🔍 <b>{title}</b>\n\nNo signals found for today."
+            return f"🔍 <b>{title}</b>\n\nNo active signals."
         
         message = f"📊 <b>{title}</b>\n\n"
         
@@ -138,7 +142,7 @@ This bot provides real-time technical analysis and trading signals for Nifty 50
     
     async def today_signals_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /today command"""
-        all_signals = self.get_signals_from_db(limit=50)
+        all_signals = self.get_today_signals_from_db(limit=50)
         
         buy_count = len([s for s in all_signals if s[1] == 'BUY'])
         sell_count = len([s for s in all_signals if s[1] == 'SELL'])
@@ -185,14 +189,8 @@ This bot provides real-time technical analysis and trading signals for Nifty 50
         """Handle /status command"""
         try:
             # Check database
-            conn = sqlite3.connect('nifty_analysis.db')
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM analysis_results WHERE DATE(timestamp) = DATE('now')")
-            today_signals = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT timestamp FROM analysis_results ORDER BY timestamp DESC LIMIT 1")
-            last_update = cursor.fetchone()
-            conn.close()
+            today_signals = db.fetch_one("SELECT COUNT(*) FROM analysis_results WHERE timestamp >= ?", (db.day_start(),))[0]
+            last_update = db.fetch_one("SELECT timestamp FROM analysis_results ORDER BY timestamp DESC LIMIT 1")
             
             last_update_str = "Never"
             if last_update:
@@ -0,0 +1,249 @@
+import os
+import time
+import threading
+import logging
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from concurrency import TokenBucket
+from metrics import TELEGRAM_SEND_SECONDS, TELEGRAM_MESSAGES_SENT, TELEGRAM_SEND_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# Point at a local stand-in server to test the bot without Telegram
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')
+
+# Seconds Telegram holds a getUpdates call open waiting for new messages
+LONG_POLL_TIMEOUT = int(os.getenv('TELEGRAM_POLL_TIMEOUT', '30'))
+
+
+class TelegramClient:
+    """Thin Bot API client over keep-alive HTTP sessions
+
+    Long polling holds its connection open, so it gets its own session and
+    replies/alerts reuse pooled connections from a second one.
+    """
+
+    def __init__(self, token, api_url=None):
+        self.base_url = f"{(api_url or TELEGRAM_API_URL).rstrip('/')}/bot{token}"
+
+        self.poll_session = requests.Session()
+        self.send_session = requests.Session()
+        self.send_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=8))
+        self.send_session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=8))
+
+    def method_url(self, method):
+        return f"{self.base_url}/{method}"
+
+    def get_me(self):
+        """Return the bot's user record, or None if the token is rejected"""
+        response = self.send_session.get(self.method_url('getMe'), timeout=10)
+        if response.status_code != 200:
+            return None
+        return response.json().get('result', {})
+
+    def get_updates(self, offset, timeout=LONG_POLL_TIMEOUT):
+        """Long-poll for updates after offset; returns immediately when one arrives"""
+        response = self.poll_session.get(
+            self.method_url('getUpdates'),
+            params={'offset': offset, 'timeout': timeout},
+            timeout=timeout + 10
+        )
+        response.raise_for_status()
+        return response.json().get('result', [])
+
+    def send_message(self, chat_id, text, parse_mode='HTML'):
+        """Send a message and return the raw HTTP response"""
+        return self.send_session.post(
+            self.method_url('sendMessage'),
+            data={'chat_id': chat_id, 'text': text, 'parse_mode': parse_mode},
+            timeout=30
+        )
+
+    def close(self):
+        self.poll_session.close()
+        self.send_session.close()
+
+
+# Telegram rejects messages longer than this many characters
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+# Telegram allows about one message per second per chat and 30 per second overall
+TELEGRAM_CHAT_INTERVAL = float(os.getenv('TELEGRAM_CHAT_INTERVAL', '1.0'))
+TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', '25'))
+
+MAX_SEND_ATTEMPTS = 3
+
+
+def split_message(text, limit=TELEGRAM_MESSAGE_LIMIT):
+    """Split text into chunks under the limit, preferring paragraph and line breaks"""
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind('\n\n', 0, limit)
+        if cut <= 0:
+            cut = text.rfind('\n', 0, limit)
+        if cut <= 0:
+            cut = limit
+        parts.append(text[:cut].rstrip('\n'))
+        text = text[cut:].lstrip('\n')
+    if text:
+        parts.append(text)
+    return parts
+
+
+def retry_after_seconds(response):
+    """Read Telegram's retry_after hint from a 429 response"""
+    try:
+        return float(response.json()['parameters']['retry_after'])
+    except (ValueError, KeyError, TypeError):
+        return float(response.headers.get('Retry-After', 1))
+
+
+class OutboundQueue:
+    """Background sender with per-chat pacing, 429 backoff and alert coalescing
+
+    Coalescable messages (signal alerts) waiting for the same chat are merged
+    into one message; long messages are split to fit Telegram's limit.
+    """
+
+    def __init__(self, client, chat_interval=TELEGRAM_CHAT_INTERVAL, global_rate=TELEGRAM_GLOBAL_RATE):
+        self.client = client
+        self.chat_interval = chat_interval
+        self.global_limiter = TokenBucket(global_rate, global_rate)
+
+        self.pending = deque()
+        self.chat_ready_at = {}
+        self.condition = threading.Condition()
+        self.worker = None
+
+        self.metrics = {
+            'sent': 0,
+            'failed': 0,
+            'rate_limited': 0,
+            'coalesced': 0,
+            'send_seconds_total': 0.0,
+            'send_seconds_max': 0.0,
+            'queue_seconds_total': 0.0,
+            'queue_seconds_max': 0.0
+        }
+
+    def send(self, chat_id, text, coalesce=False):
+        """Queue a message; returns immediately"""
+        chat_id = str(chat_id)
+        with self.condition:
+            if coalesce:
+                for entry in self.pending:
+                    if entry['chat_id'] == chat_id and entry['coalesce']:
+                        entry['text'] += '\n\n' + text
+                        self.metrics['coalesced'] += 1
+                        return
+
+            self.pending.append({
+                'chat_id': chat_id,
+                'text': text,
+                'coalesce': coalesce,
+                'enqueued': time.monotonic(),
+                'attempts': 0
+            })
+            self.condition.notify()
+
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run, name='telegram-sender', daemon=True)
+                self.worker.start()
+
+    def depth(self):
+        with self.condition:
+            return len(self.pending)
+
+    def stats(self):
+        """Queue depth and send counters for monitoring"""
+        with self.condition:
+            stats = dict(self.metrics)
+            stats['queue_depth'] = len(self.pending)
+        sent = stats['sent'] or 1
+        stats['send_seconds_avg'] = round(stats['send_seconds_total'] / sent, 4)
+        stats['queue_seconds_avg'] = round(stats['queue_seconds_total'] / sent, 4)
+        return stats
+
+    def next_entry(self):
+        """Pop the oldest message whose chat may send now, waiting if none can"""
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                wait = None
+                for entry in self.pending:
+                    ready_at = self.chat_ready_at.get(entry['chat_id'], 0)
+                    if ready_at <= now:
+                        self.pending.remove(entry)
+                        return entry
+                    wait = ready_at - now if wait is None else min(wait, ready_at - now)
+                self.condition.wait(timeout=wait)
+
+    def run(self):
+        while True:
+            entry = self.next_entry()
+            try:
+                self.deliver(entry)
+            except Exception as e:
+                logger.error(f"Telegram sender error: {e}")
+
+    def retry_entry(self, entry, parts):
+        """Requeue already-split parts; later alerts must not merge into text that is no longer sent"""
+        return dict(entry, parts=parts, coalesce=False)
+
+    def deliver(self, entry):
+        parts = entry.get('parts') or split_message(entry['text'])
+        if not parts:
+            return
+        text = parts[0]
+        chat_id = entry['chat_id']
+
+        self.global_limiter.acquire()
+        started = time.monotonic()
+        try:
+            response = self.client.send_message(chat_id, text)
+            status = response.status_code
+        except Exception as e:
+            logger.error(f"Error sending message to chat {chat_id}: {e}")
+            response, status = None, None
+        elapsed = time.monotonic() - started
+        TELEGRAM_SEND_SECONDS.observe(elapsed)
+
+        with self.condition:
+            now = time.monotonic()
+            self.chat_ready_at[chat_id] = now + self.chat_interval
+
+            if status == 200:
+                queued = now - entry['enqueued']
+                self.metrics['sent'] += 1
+                TELEGRAM_MESSAGES_SENT.inc()
+                self.metrics['send_seconds_total'] += elapsed
+                self.metrics['send_seconds_max'] = max(self.metrics['send_seconds_max'], elapsed)
+                self.metrics['queue_seconds_total'] += queued
+                self.metrics['queue_seconds_max'] = max(self.metrics['queue_seconds_max'], queued)
+                logger.info(f"Message sent to chat {chat_id}")
+
+                if len(parts) > 1:
+                    # The rest of a split message goes next, after the chat's pacing delay
+                    rest = dict(entry, parts=parts[1:], coalesce=False, attempts=0)
+                    self.pending.appendleft(rest)
+            elif status == 429:
+                delay = retry_after_seconds(response)
+                self.metrics['rate_limited'] += 1
+                TELEGRAM_SEND_ERRORS.inc(reason='rate_limited')
+                self.chat_ready_at[chat_id] = now + delay
+                self.pending.appendleft(self.retry_entry(entry, parts))
+                logger.warning(f"Telegram rate limited chat {chat_id}; retrying in {delay:.0f}s")
+            else:
+                TELEGRAM_SEND_ERRORS.inc(reason='network' if response is None else 'http_error')
+                entry['attempts'] += 1
+                if entry['attempts'] < MAX_SEND_ATTEMPTS:
+                    self.chat_ready_at[chat_id] = now + self.chat_interval * 2 ** entry['attempts']
+                    self.pending.appendleft(self.retry_entry(entry, parts))
+                else:
+                    self.metrics['failed'] += 1
+                    detail = response.text if response is not None else 'no response'
+                    logger.error(f"Failed to send message to chat {chat_id}: {detail}")
+            self.condition.notify()
@@ -0,0 +1,112 @@
+import os
+import zlib
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Name of a list in UNIVERSE_DIR (universes/nifty50.txt), or an explicit file
+UNIVERSE = os.getenv('UNIVERSE', 'nifty50')
+UNIVERSE_FILE = os.getenv('UNIVERSE_FILE')
+UNIVERSE_DIR = os.getenv('UNIVERSE_DIR', 'universes')
+
+# Run SHARD_COUNT analyzer workers, each with its own SHARD_INDEX, to split the universe
+SHARD_INDEX = int(os.getenv('SHARD_INDEX', '0'))
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '1'))
+
+DEFAULT_SUFFIX = '.NS'
+
+# Used when no universe file can be found
+FALLBACK_SYMBOLS = [
+    "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS",
+    "HINDUNILVR.NS", "ICICIBANK.NS", "SBIN.NS", "BHARTIARTL.NS",
+    "ITC.NS", "KOTAKBANK.NS", "LT.NS", "AXISBANK.NS",
+    "ASIANPAINT.NS", "MARUTI.NS", "SUNPHARMA.NS"
+]
+
+
+def normalize_symbol(symbol):
+    """Upper-case a symbol and add the NSE suffix when it has no exchange suffix"""
+    symbol = symbol.strip().upper()
+    if symbol and '.' not in symbol:
+        symbol += DEFAULT_SUFFIX
+    return symbol
+
+
+def read_symbols(path):
+    """Read one symbol per line (or comma-separated), ignoring # comments and duplicates"""
+    symbols = []
+    seen = set()
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            for item in line.split(','):
+                symbol = normalize_symbol(item)
+                if symbol and symbol not in seen:
+                    seen.add(symbol)
+                    symbols.append(symbol)
+    return symbols
+
+
+def universe_path(name=None, path=None):
+    if path or UNIVERSE_FILE:
+        return path or UNIVERSE_FILE
+    return os.path.join(UNIVERSE_DIR, f"{name or UNIVERSE}.txt")
+
+
+def load_universe(name=None, path=None):
+    """Load the configured symbol list, falling back to the built-in top 15"""
+    path = universe_path(name, path)
+    try:
+        symbols = read_symbols(path)
+        if symbols:
+            logger.info(f"Loaded {len(symbols)} symbols from {path}")
+            return symbols
+        logger.warning(f"Universe file {path} is empty")
+    except OSError as e:
+        logger.warning(f"Could not read universe file {path}: {e}")
+
+    logger.warning(f"Falling back to the built-in {len(FALLBACK_SYMBOLS)} symbols")
+    return list(FALLBACK_SYMBOLS)
+
+
+def shard_of(symbol, shard_count):
+    """Stable shard for a symbol; unaffected by list order or other symbols"""
+    return zlib.crc32(symbol.encode('utf-8')) % shard_count
+
+
+def shard_symbols(symbols, shard_index=SHARD_INDEX, shard_count=SHARD_COUNT):
+    """Symbols belonging to one shard, in their original order"""
+    if shard_count <= 1:
+        return list(symbols)
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"SHARD_INDEX {shard_index} is outside 0..{shard_count - 1}")
+    return [s for s in symbols if shard_of(s, shard_count) == shard_index]
+
+
+class UniverseRotation:
+    """Hands out symbols starting where the last budgeted cycle stopped
+
+    When a cycle runs out of time the symbols it did not reach are first in
+    line next cycle, so every symbol is scanned even if one cycle can't
+    cover the whole universe.
+    """
+
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        self.offset = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def pending(self):
+        """All symbols, starting with the first one not yet scanned"""
+        with self.lock:
+            return self.symbols[self.offset:] + self.symbols[:self.offset]
+
+    def advance(self, count):
+        """Mark count symbols from the start of pending() as scanned"""
+        with self.lock:
+            if self.symbols:
+                self.offset = (self.offset + count) % len(self.symbols)
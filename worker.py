@@ -0,0 +1,31 @@
+import os
+import logging
+
+import metrics
+from analyzer import SimpleNiftyAnalyzer, run_analysis_loop
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Run the analyzer, scheduler and Telegram bot without the web tier
+
+    Pair with the web app started as ANALYZER_MODE=web so only this process
+    scans the market and polls Telegram.
+    """
+    logger.info("Starting Nifty 50 analysis worker...")
+    
+    # The web tier's /metrics only covers its own process
+    metrics_port = os.getenv('METRICS_PORT')
+    if metrics_port and metrics.registry.enabled:
+        metrics.serve(int(metrics_port))
+    
+    analyzer = SimpleNiftyAnalyzer()
+    run_analysis_loop(analyzer)
+
+if __name__ == "__main__":
+    main()